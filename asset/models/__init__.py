@@ -1,5 +1,6 @@
 from .idc import *
 from .region import *
+from .count import *
 
 
-__all__ = ['IDC', 'Region', 'Zone']
+__all__ = ['IDC', 'Region', 'Zone', 'RegionPlan', 'region_plan', 'Count']
@@ -14,7 +14,7 @@ class Count(DisplayModel):
         db_table = 'count'
         verbose_name = '统计数'
         unique_together = ('region', 'project', 'interface')
-        ordering = ('idc', 'name', 'enable')
+        ordering = ('region', 'interface')
 
     record_num = models.IntegerField(default=0, verbose_name='记录数量')
 
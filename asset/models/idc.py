@@ -19,3 +19,17 @@ class IDC(DisplayModel):
     name = models.CharField(max_length=64, unique=True, verbose_name='名字')
     enable = models.BooleanField(default=True, verbose_name='是否启用')
     comment = models.TextField(null=True, blank=True, verbose_name='备注')
+
+    def post_update(self):
+        """
+        对象更新后使地域计划失效，标识变更会影响地域所属的供应商
+        """
+        from .region import region_plan
+        region_plan.invalidate()
+
+    def post_delete(self):
+        """
+        对象删除后使地域计划失效
+        """
+        from .region import region_plan
+        region_plan.invalidate()
@@ -1,8 +1,12 @@
+from typing import Dict, List, Optional, Tuple
+from threading import Lock
 from django.db import models
 from common.models import DisplayModel
+from .idc import IDC
+import time
 
 
-__all__ = ['Region', 'Zone']
+__all__ = ['Region', 'Zone', 'RegionPlan', 'region_plan']
 
 
 # 地域状态
@@ -34,6 +38,24 @@ class Region(DisplayModel):
     # 逻辑外键
     idc = models.CharField(max_length=32, verbose_name='供应商UUID')
 
+    def post_create(self):
+        """
+        对象创建后使地域计划失效
+        """
+        region_plan.invalidate()
+
+    def post_update(self):
+        """
+        对象更新后使地域计划失效
+        """
+        region_plan.invalidate()
+
+    def post_delete(self):
+        """
+        对象删除后使地域计划失效
+        """
+        region_plan.invalidate()
+
 
 class Zone(DisplayModel):
     """
@@ -54,4 +76,64 @@ class Zone(DisplayModel):
     comment = models.TextField(null=True, verbose_name='备注')
 
     # 逻辑外键
-    region = models.CharField(max_length=32, verbose_name='区域UUID')
\ No newline at end of file
+    region = models.CharField(max_length=32, verbose_name='区域UUID')
+
+
+class RegionPlan:
+    """
+    按供应商标识索引的地域计划，只包含供应商下已启用的地域标识，用于多地域请求的构建
+    地域或供应商变更时在当前进程中失效，其他进程中的计划在有效期后重新加载
+    """
+
+    def __init__(self, ttl: float = 300) -> None:
+        """
+        初始化
+        :param ttl: 计划的有效期，单位秒
+        """
+        self._ttl = ttl
+        self._plans: Dict[str, Tuple[float, List[str]]] = {}
+        self._lock = Lock()
+
+    def get_regions(self, csp: str) -> List[str]:
+        """
+        获取供应商下已启用的地域标识列表
+        :param csp: 供应商标识
+        :return: 地域标识列表
+        """
+        plan = self._plans.get(csp)
+        if plan and plan[0] > time.monotonic():
+            return plan[1]
+
+        with self._lock:
+            plan = self._plans.get(csp)
+            if plan and plan[0] > time.monotonic():
+                return plan[1]
+            regions = self._load(csp)
+            self._plans[csp] = (time.monotonic() + self._ttl, regions)
+            return regions
+
+    def invalidate(self, csp: Optional[str] = None) -> None:
+        """
+        使地域计划失效
+        :param csp: 供应商标识，为空时使所有供应商的计划失效
+        """
+        with self._lock:
+            if csp is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(csp, None)
+
+    @staticmethod
+    def _load(csp: str) -> List[str]:
+        """
+        通过只查询标识字段的子查询加载地域计划
+        :param csp: 供应商标识
+        :return: 地域标识列表
+        """
+        idc_uuids = IDC.dao.get_queryset(flag=csp).values('uuid')
+        queryset = Region.dao.get_queryset(idc__in=idc_uuids, enable=True)
+        return list(queryset.values_list('flag', flat=True))
+
+
+# 外部使用的实例，进程内共享
+region_plan = RegionPlan()
@@ -5,6 +5,7 @@ from django.conf import settings
 from utils import safe_json_loads, safe_json_dumps
 from cloud.sdk import CloudSDKRequest, CloudSDKClient
 from cloud.storage import CloudStorageEngine
+from cloud.exceptions import CloudSDKClientError
 
 
 __all__ = ['ResourceSyncTask']
@@ -38,11 +39,16 @@ class ResourceSyncTask(AbstractTask):
             os.remove(backup_file)
             return
 
-        # 否则使用 SDK 请求得到的数据进行存储
+        # 否则使用 SDK 请求得到的数据进行存储，开启分页检查点，失败重跑时只请求缺失的分页
         client = CloudSDKClient()
-        req = CloudSDKRequest(self.idc, self.action, self.req_params)
+        req = CloudSDKRequest(self.idc, self.action, checkpoint=True, **(self.req_params or {}))
         data = client.execute(req)
 
+        # 熔断器打开而跳过的地域没有数据，同步不完整的数据会误删这些地域的资源，因此作业失败，等待重跑
+        if data.skipped_regions:
+            raise CloudSDKClientError(
+                f'{self.idc}:{self.action} skipped regions with open circuit breaker: {data.skipped_regions}')
+
         try:
             self._sync_to_storage(data)
         except Exception as e:
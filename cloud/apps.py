@@ -1,5 +1,12 @@
 from django.apps import AppConfig
 
 
-class AssetConfig(AppConfig):
+class CloudConfig(AppConfig):
     name = 'cloud'
+
+    def ready(self) -> None:
+        """
+        启动时编译所有动作的描述，执行请求时不再加载类和查找配置
+        """
+        from .sdk import action_registry
+        action_registry.compile_all()
@@ -1,3 +1,4 @@
+from .timeseries import *
 from .abstract import *
 from .qcloud import *
 from .alicloud import *
\ No newline at end of file
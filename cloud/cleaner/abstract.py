@@ -1,10 +1,98 @@
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Iterable, List, Tuple, Union
 from abc import ABC, abstractmethod
 from utils import safe_json_loads
-from ..sdk import CloudSDKLowLayerRequest
+from ..sdk import CloudSDKLowLayerRequest, DedupIndex, ColumnarRecords
+from .timeseries import MonitorFrame
 
 
-__all__ = ['AbstractCloudCleaner']
+__all__ = ['CleanPlan', 'AbstractCloudCleaner']
+
+
+class CleanPlan:
+    """
+    清洗计划，由动作的输出配置编译得到，每个清洗器类和动作只编译一次，由动作描述缓存
+    多层次键预先拆分，字段方法和钩子预先查找，请求来源的字段在每页只计算一次
+    """
+
+    def __init__(self, cleaner_class: type, action: str, interface: dict) -> None:
+        """
+        编译输出配置
+        :param cleaner_class: 清洗器类
+        :param action: 动作标识
+        :param interface: 接口配置
+        """
+        output = interface.get('output') or {}
+        self.data_path = self.split_key(output.get('data') or '')
+
+        # 字段编译为 (字段, 类型, 参数, 映射, 默认值)，类型决定参数的含义
+        self.fields = []
+        for k, conf in (output.get('fields') or {}).items():
+            kind, arg = self._compile_source(cleaner_class, action, k, conf['src'], conf['key'])
+            self.fields.append((k, kind, arg, conf['mapping'], conf['default']))
+
+        # 字段顺序，紧凑记录中的值按该顺序排列
+        self.schema: Tuple[str, ...] = tuple(k for k, *_ in self.fields)
+
+        # 钩子编译为 (方法名, 参数)，方法不存在时为 None
+        self.hooks = {}
+        for hook, conf in (output.get('hooks') or {}).items():
+            self.hooks[hook] = None
+            if conf and conf['method']:
+                if conf['base'] == 'common':
+                    name = f'_do_{hook}_{conf["method"]}'
+                else:
+                    name = f'_do_{action}_{hook}_{conf["method"]}'
+                if hasattr(cleaner_class, name):
+                    self.hooks[hook] = (name, conf['kwargs'] or {})
+
+        # 数据路径每层均为对象的键，且没有需要完整响应的开始钩子时，可增量解析响应
+        self.streamable = bool(self.data_path) and not self.hooks.get('start') and \
+            not any(p == 'N' or p.isdigit() for p in self.data_path)
+
+    @staticmethod
+    def split_key(key: str) -> Tuple[str, ...]:
+        """
+        拆分多层次键
+        :param key: 多层次键，用 . 表示层次
+        :return: 键的各层组成的元组
+        """
+        return tuple(key.split('.')) if key else ()
+
+    @classmethod
+    def _compile_source(cls, cleaner_class: type, action: str, k: str, src: str, key: str) -> Tuple[str, Any]:
+        """
+        编译字段的来源
+        :param cleaner_class: 清洗器类
+        :param action: 动作标识
+        :param k: 字段
+        :param src: 来源
+        :param key: 来源中的键或方法
+        :return: 类型和参数组成的元组
+        """
+        # 请求来源在整页中不变，除非键中包含表示数据编号的 N
+        if src == 'req':
+            if not key:
+                return 'req_all', None
+            path = cls.split_key(key)
+            return ('req_path' if 'N' in path else 'req_const'), path
+
+        # 数据来源中单层键直接取值，其余按层次取值
+        if src == 'data':
+            if not key:
+                return 'data_all', None
+            path = cls.split_key(key)
+            if len(path) == 1 and path[0] != 'N' and not path[0].isdigit():
+                return 'data_key', path[0]
+            return 'data_path', path
+
+        # 方法来源的 key 未设置，以及来源未设置，则使用默认方法
+        if src == 'method' and key:
+            name = f'_{key}'
+        else:
+            name = f'_get_{action}_{k}'
+        if hasattr(cleaner_class, name):
+            return 'method', name
+        return 'none', None
 
 
 class AbstractCloudCleaner(ABC):
@@ -20,8 +108,20 @@ class AbstractCloudCleaner(ABC):
         self._req = request
         self._action = request.parent.action
         self._interface = request.parent.interface_conf
+        self._plan: CleanPlan = request.parent.descriptor.clean_plan
+        self._compact: bool = request.parent.descriptor.compact_records
         self._origin_resp = None
 
+    @classmethod
+    def compile_plan(cls, action: str, interface: dict) -> CleanPlan:
+        """
+        编译动作的清洗计划
+        :param action: 动作标识
+        :param interface: 接口配置
+        :return: 清洗计划
+        """
+        return CleanPlan(cls, action, interface)
+
     def clean(self, resp: dict) -> dict:
         """
         清洗响应数据的入口
@@ -55,20 +155,10 @@ class AbstractCloudCleaner(ABC):
         :param resp_or_data: 响应或数据
         :return: 触发钩子处理后的响应
         """
-        conf = self._interface['output']['hooks'][hook]
-        if conf['method']:
-            method = conf['method']
-            kwargs = conf['kwargs'] or {}
-
-            if conf['base'] == 'common':
-                hook_method = getattr(self, f'_do_{hook}_{method}', None)
-            else:
-                hook_method = getattr(
-                    self, f'_do_{self._action}_{hook}_{method}', None)
-
-            if hook_method:
-                resp_or_data = hook_method(resp_or_data, **kwargs)
-
+        compiled = self._plan.hooks.get(hook)
+        if compiled:
+            name, kwargs = compiled
+            resp_or_data = getattr(self, name)(resp_or_data, **kwargs)
         return resp_or_data
 
     def _clean_query_resp(self, resp: dict) -> dict:
@@ -78,30 +168,160 @@ class AbstractCloudCleaner(ABC):
         :return: 清洗后的数据
         """
         # 提取数据列表，若结果为字符串则进行反序列化
-        data = self._extract_deep_value(
-            self._interface['output']['data'], resp, 0)
+        data = self._extract_path(self._plan.data_path, resp, 0)
         if isinstance(data, str):
             data = safe_json_loads(data)
 
-        # 根据配置进行所以记录的清洗，k 和 v 分别表示最后得到的键和值
-        fields = self._interface['output']['fields']
-        new_data = []
-        num = 0
-        for d in data:
-            new_d = self._clean_single_query_data(d, num, fields)
-            new_data.append(new_d)
-            num += 1
+        # 列式数据按列清洗，其余数据逐条清洗
+        new_data = None
+        if isinstance(data, MonitorFrame):
+            new_data = self._clean_columnar_data(data)
+        if new_data is None:
+            new_data = self._clean_records(data)
 
-        # 获取现有长度和总长度
+        # 获取现有长度和总长度，游标分页的总数未知，以分页的记录数作为总数，由客户端累加
         current = len(new_data)
-        total = resp.get('TotalCount', current)
+        if self._req.parent.cursor_paging:
+            total = current
+        else:
+            total = resp.get('TotalCount', current)
 
-        # 返回标准结构
-        return {
+        # 返回标准结构，紧凑记录和列式记录附带字段顺序
+        resp = {
             'total': total,
             'current': current,
             'data': new_data,
         }
+        if self._compact or isinstance(new_data, ColumnarRecords):
+            resp['schema'] = self._plan.schema
+        return resp
+
+    def _clean_records(self, data: Iterable[dict]) -> List[Union[dict, tuple]]:
+        """
+        逐条清洗数据
+        :param data: 数据列表
+        :return: 清洗后的数据列表，紧凑记录时为按字段顺序排列的元组列表
+        """
+        # 整页不变的字段预先计算得到模板，其余字段逐条计算
+        template, getters = self._bind_fields()
+        if self._compact:
+            return self._clean_compact_records(data, template, getters)
+
+        new_data = []
+        for num, d in enumerate(data):
+            new_d = template.copy()
+            for k, getter, mapping, default in getters:
+                v = getter(d, num)
+                # 若值 v 为空 则取默认值，若映射 mapping 已设置，则取映射值，映射失败则使用默认值
+                if v is None:
+                    v = default
+                elif mapping:
+                    v = mapping.get(v, default)
+                new_d[k] = v
+            new_data.append(new_d)
+        return new_data
+
+    @staticmethod
+    def _clean_compact_records(
+            data: Iterable[dict],
+            template: dict,
+            getters: List[Tuple[str, Callable[[Any, int], Any], Optional[dict], Any]]) -> List[tuple]:
+        """
+        逐条清洗数据，得到按字段顺序排列的元组，比字典节省内存
+        :param data: 数据列表
+        :param template: 字段模板
+        :param getters: 逐条计算的字段的取值函数列表
+        :return: 元组列表
+        """
+        positions = {k: i for i, k in enumerate(template)}
+        getters = [(positions[k], getter, mapping, default) for k, getter, mapping, default in getters]
+        base = list(template.values())
+        new_data = []
+        for num, d in enumerate(data):
+            row = base.copy()
+            for i, getter, mapping, default in getters:
+                v = getter(d, num)
+                if v is None:
+                    v = default
+                elif mapping:
+                    v = mapping.get(v, default)
+                row[i] = v
+            new_data.append(tuple(row))
+        return new_data
+
+    def _clean_columnar_data(self, frame: MonitorFrame) -> Optional[ColumnarRecords]:
+        """
+        按列清洗列式数据，字段均为整页不变或取自单层列名时才可按列清洗
+        清洗结果保持为列，由响应在调用方访问记录时组装
+        :param frame: 列式数据
+        :return: 清洗后的列式记录，无法按列清洗时返回 None
+        """
+        template, getters = self._bind_fields()
+        dynamic = {k for k, *_ in getters}
+        n = len(frame)
+
+        columns = []
+        for k, kind, arg, mapping, default in self._plan.fields:
+            if k not in dynamic:
+                columns.append([template[k]] * n)
+                continue
+            if kind != 'data_key':
+                return None
+
+            values = frame.column_list(arg)
+            if values is None:
+                columns.append([default] * n)
+            elif mapping:
+                columns.append([default if v is None else mapping.get(v, default) for v in values])
+            elif default is not None and None in values:
+                columns.append([default if v is None else v for v in values])
+            else:
+                columns.append(values)
+
+        return ColumnarRecords(self._plan.schema, columns)
+
+    def _bind_fields(self) -> Tuple[dict, List[Tuple[str, Callable[[Any, int], Any], Optional[dict], Any]]]:
+        """
+        将清洗计划中的字段绑定到当前清洗器和请求
+        :return: 包含所有字段且整页不变的字段已取值的模板，以及逐条计算的字段的取值函数列表
+        """
+        template = {}
+        getters = []
+        params = self._req.params
+        extract = self._extract_path
+
+        for k, kind, arg, mapping, default in self._plan.fields:
+            getter = None
+            if kind == 'req_all':
+                v = params
+            elif kind == 'req_const':
+                v = extract(arg, params, 0)
+            elif kind == 'none':
+                v = None
+            else:
+                v = None
+                if kind == 'data_key':
+                    getter = (lambda key: lambda d, num: d.get(key))(arg)
+                elif kind == 'data_path':
+                    getter = (lambda path: lambda d, num: extract(path, d, num))(arg)
+                elif kind == 'data_all':
+                    getter = lambda d, num: d
+                elif kind == 'req_path':
+                    getter = (lambda path: lambda d, num: extract(path, params, num))(arg)
+                else:
+                    getter = getattr(self, arg)
+
+            if getter:
+                template[k] = None
+                getters.append((k, getter, mapping, default))
+            elif v is None:
+                template[k] = default
+            elif mapping:
+                template[k] = mapping.get(v, default)
+            else:
+                template[k] = v
+
+        return template, getters
 
     @abstractmethod
     def _clean_operation_resp(self, resp: dict) -> dict:
@@ -120,8 +340,19 @@ class AbstractCloudCleaner(ABC):
         :param data: 数据
         :return: 值
         """
+        return AbstractCloudCleaner._extract_path(CleanPlan.split_key(key), data, num)
+
+    @staticmethod
+    def _extract_path(path: Tuple[str, ...], data: Any, num: int) -> Any:
+        """
+        从数据中提取预先拆分的多层次键的对应值
+        :param path: 键的各层组成的元组
+        :param data: 数据
+        :param num: 数据编号，用于替换键中的 N
+        :return: 值
+        """
         v = data
-        for p in key.split('.'):
+        for p in path:
             if isinstance(v, list):
                 try:
                     v = v[num] if p == 'N' else v[int(p)]
@@ -133,89 +364,23 @@ class AbstractCloudCleaner(ABC):
                 break
         return v
 
-    def _clean_single_query_data(self, data: dict, num: int, fields: dict) -> dict:
-        """
-        清洗单条查询结果的数据
-        :param data: 单条数据
-        :param num: 单条数据编号
-        :param fields: 字段配置
-        :return: 清洗后的数据
-        """
-        # 单个键和配置的获取
-        new_data = {}
-        for k, conf in fields.items():
-            src = conf['src']
-            key = conf['key']
-            mapping = conf['mapping']
-            default = conf['default']
-
-            v = None
-            # 各个来源来获取值 v，若 key 未设置则返回来源本身
-            if src == 'req':
-                if key:
-                    v = self._extract_deep_value(key, self._req.request_params, num)
-                else:
-                    v = self._req.request_params
-
-            elif src == 'data':
-                if key:
-                    v = self._extract_deep_value(key, data, num)
-                else:
-                    v = data
-
-            elif src == 'method' and key:
-                v_method = getattr(self, f'_{key}', None)
-                if v_method:
-                    v = v_method(data, num)
-
-            # 方法来源的 key 为设置，以及来源未设置，则根据默认方法来获取值 v
-            else:
-                v_method = getattr(self, f'_get_{self._action}_{k}', None)
-                if v_method:
-                    v = v_method(data, num)
-
-            # 若值 v 为空 则取默认值
-            if v is None:
-                v = default
-            # 若映射 mapping 已设置，则取映射值，映射失败则使用默认值
-            elif mapping:
-                v = mapping.get(v, default)
-
-            # 更新键值
-            new_data.update({k: v})
-
-        return new_data
-
     @staticmethod
     def _do_end_make_unique(resp: dict, unique_keys: Optional[list] = None):
         """
-        保留联合唯一的记录，利用集合来实现
+        保留分页内联合唯一的记录，利用去重索引来实现，跨分页和地域的去重由响应合并时完成
+        响应中的其他键如紧凑记录的字段顺序原样保留
         :param resp: 响应数据
         :param unique_keys: 联合唯一的键
         :return: 联合唯一的响应数据
         """
-        if not isinstance(resp['data'], list):
+        data = resp['data']
+        if isinstance(data, ColumnarRecords):
+            data = data.to_rows()
+        if not isinstance(data, list) or not unique_keys:
             return resp
 
-        unique_data = []
-        unique_set = set()
-
-        for r in resp['data']:
-            kv_list = []
-            for k, v in r.items():
-                if k in unique_keys:
-                    kv_list.append((k, v))
-
-            kv_tuple = tuple(kv_list)
-            if kv_tuple not in unique_set:
-                unique_set.add(kv_tuple)
-                unique_data.append(r)
-
+        unique_data = DedupIndex(unique_keys).filter(data, schema=resp.get('schema'))
         current = len(unique_data)
-        total = resp['total'] - (current - resp[current])
+        total = resp['total'] - (resp['current'] - current)
 
-        return {
-            'total': total,
-            'current': current,
-            'data': unique_data,
-        }
+        return dict(resp, total=total, current=current, data=unique_data)
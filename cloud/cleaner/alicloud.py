@@ -1,5 +1,6 @@
 from .abstract import AbstractCloudCleaner
-from utils import get_datetime_with_tz, safe_json_loads
+from .timeseries import MonitorFrame
+from utils import safe_json_loads
 
 
 class ALiCloudCleaner(AbstractCloudCleaner):
@@ -34,20 +35,13 @@ class ALiCloudCleaner(AbstractCloudCleaner):
     @staticmethod
     def _do_query_monitor_data_start_hook(resp: dict) -> dict:
         """
-        开始钩子，转换其中的时间戳为日期，将值转为百分比
+        开始钩子，将数据点按实例转为列式监控数据，毫秒时间戳在清洗时按列转换为日期
         :param resp: 响应数据
         :return: 清洗后数据
         """
-        data = safe_json_loads(resp['Datapoints'])
-        for d in data:
-            dt = get_datetime_with_tz(d['timestamp'] // 1000)
-            d.update({
-                'Day': dt.date(),
-                'Hour': dt.hour,
-                'Minute': dt.minute,
-                'Average': d['Average']
-            })
-        resp['Datapoints'] = data
+        data = safe_json_loads(resp['Datapoints']) or []
+        resp['MonitorFrame'] = MonitorFrame.from_records(
+            data, ts_key='timestamp', value_key='Average', host_key='instanceId', ts_unit='ms')
         return resp
 
     @staticmethod
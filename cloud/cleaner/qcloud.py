@@ -1,5 +1,5 @@
 from .abstract import AbstractCloudCleaner
-from utils import get_datetime_with_tz
+from .timeseries import MonitorSeries, MonitorFrame
 
 
 class QCloudCleaner(AbstractCloudCleaner):
@@ -31,36 +31,15 @@ class QCloudCleaner(AbstractCloudCleaner):
     @staticmethod
     def _do_query_monitor_data_start_hook(resp: dict) -> dict:
         """
-        开始钩子，转换其中的时间戳为日期，并和 values 列表进行合并
+        开始钩子，将各实例的时间戳和值转为列式监控数据，时间戳在清洗时按列转换为日期
         :param resp: 响应数据
         :return: 清洗后数据
         """
-        new_values = []
-        timestamps = resp['DataPoints'][0]['Timestamps']
-        values = resp['DataPoints'][0]['Values']
+        series = []
+        for data_points in resp['DataPoints']:
+            host = data_points['Dimensions'][0]['Value'] if data_points.get('Dimensions') else None
+            series.append(MonitorSeries(host, None, data_points['Timestamps'], data_points['Values']))
 
-        i = 0
-        for ts in timestamps:
-            dt = get_datetime_with_tz(ts)
-            v = values[i]
-            new_value = {
-                'Day': dt.date(),
-                'Hour': dt.hour,
-                'Minute': dt.minute,
-                'Value': v
-            }
-            new_values.append(new_value)
-            i += 1
-
-        resp['DataPoints'][0]['Values'] = new_values
+        resp['MonitorFrame'] = MonitorFrame(series)
         return resp
 
-    def _get_query_monitor_data_host(self, data: dict, num: int) -> str:
-        """
-        可用区状态字段清洗
-        :param data: 数据
-        :param num: 数据编号
-        :return: 状态编号
-        """
-        return self._origin_resp['DataPoints'][0]['Dimensions'][0]['Value']
-
@@ -0,0 +1,216 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['MonitorSeries', 'MonitorFrame']
+
+
+class MonitorSeries:
+    """
+    单个主机和指标的监控时间序列，以 NumPy 数组保存时间戳和值，时区转换和按日、时、分分桶均为向量化计算
+    """
+
+    def __init__(self, host: Optional[str], metric: Optional[str], timestamps: Any, values: Any) -> None:
+        """
+        初始化
+        :param host: 主机标识
+        :param metric: 指标名称
+        :param timestamps: 秒级时间戳序列
+        :param values: 值序列，空值保存为 NaN
+        """
+        self.host = host
+        self.metric = metric
+        self.timestamps: np.ndarray = np.asarray(timestamps, dtype=np.int64)
+        self.values: np.ndarray = np.asarray(
+            [np.nan if v is None else v for v in values] if isinstance(values, list) else values,
+            dtype=np.float64)
+        if self.timestamps.shape != self.values.shape:
+            raise ValueError('timestamps and values must have the same length')
+        self._local = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def local_time(self) -> pd.DatetimeIndex:
+        """
+        转换为配置时区的时间，只计算一次
+        """
+        if self._local is None:
+            self._local = pd.to_datetime(self.timestamps, unit='s', utc=True).tz_convert(settings.TIME_ZONE)
+        return self._local
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """
+        获取列，主机和指标为常量列
+        :param name: 列名，可选 Host、Metric、Timestamp、Value、Day、Hour、Minute
+        :return: 列数组，列不存在时返回 None
+        """
+        if name == 'Timestamp':
+            return self.timestamps
+        if name == 'Value':
+            return self.values
+        if name == 'Day':
+            return self.local_time.date
+        if name == 'Hour':
+            return self.local_time.hour.values
+        if name == 'Minute':
+            return self.local_time.minute.values
+        if name == 'Host':
+            return np.full(len(self), self.host, dtype=object)
+        if name == 'Metric':
+            return np.full(len(self), self.metric, dtype=object)
+        return None
+
+    def aggregate(self, freq: str = 'hour', how: str = 'mean') -> MonitorSeries:
+        """
+        按本地时间的日、时或分分桶聚合，时间戳取桶的起点
+        :param freq: 分桶粒度，可选 day、hour、minute
+        :param how: 聚合方法，如 mean、max、min、sum
+        :return: 聚合后的时间序列
+        """
+        floor = {'day': 'D', 'hour': 'h', 'minute': 'min'}[freq]
+        buckets = (self.local_time.floor(floor) - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+        grouped = pd.Series(self.values).groupby(np.asarray(buckets, dtype=np.int64), sort=True).agg(how)
+        return MonitorSeries(self.host, self.metric, grouped.index.values, grouped.values)
+
+
+class MonitorFrame:
+    """
+    监控数据的列式表示，由多个主机和指标的时间序列组成，只在清洗输出时才转换为记录
+    """
+
+    columns = ('Host', 'Metric', 'Timestamp', 'Value', 'Day', 'Hour', 'Minute')
+
+    def __init__(self, series: Optional[List[MonitorSeries]] = None) -> None:
+        """
+        初始化
+        :param series: 时间序列列表
+        """
+        self.series: List[MonitorSeries] = series or []
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self.series)
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        逐条生成包含所有列的记录，用于不支持列式清洗的场景
+        """
+        for s in self.series:
+            yield from self._series_records(s, self.columns)
+
+    @classmethod
+    def from_points(cls, timestamps: list, values: list,
+                    host: Optional[str] = None, metric: Optional[str] = None) -> MonitorFrame:
+        """
+        从时间戳列表和值列表创建
+        :param timestamps: 秒级时间戳列表
+        :param values: 值列表
+        :param host: 主机标识
+        :param metric: 指标名称
+        :return: 列式监控数据
+        """
+        return cls([MonitorSeries(host, metric, timestamps, values)])
+
+    @classmethod
+    def from_records(cls, records: List[dict], ts_key: str, value_key: str, host_key: str,
+                     metric: Optional[str] = None, ts_unit: str = 's') -> MonitorFrame:
+        """
+        从数据点记录列表创建，按主机分为多个时间序列
+        :param records: 数据点记录列表
+        :param ts_key: 时间戳的键
+        :param value_key: 值的键
+        :param host_key: 主机标识的键
+        :param metric: 指标名称
+        :param ts_unit: 时间戳单位，可选 s、ms
+        :return: 列式监控数据
+        """
+        grouped: Dict[Any, Tuple[list, list]] = {}
+        for r in records:
+            timestamps, values = grouped.setdefault(r.get(host_key), ([], []))
+            timestamps.append(r[ts_key])
+            values.append(r.get(value_key))
+
+        series = []
+        for host, (timestamps, values) in grouped.items():
+            timestamps = np.asarray(timestamps, dtype=np.int64)
+            if ts_unit == 'ms':
+                timestamps //= 1000
+            series.append(MonitorSeries(host, metric, timestamps, values))
+        return cls(series)
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        """
+        获取所有时间序列拼接后的列
+        :param name: 列名
+        :return: 列数组，列不存在时返回 None
+        """
+        if name not in self.columns:
+            return None
+        if not self.series:
+            return np.empty(0, dtype=object)
+        return np.concatenate([s.column(name) for s in self.series])
+
+    def aggregate(self, freq: str = 'hour', how: str = 'mean') -> MonitorFrame:
+        """
+        对所有时间序列按本地时间分桶聚合
+        :param freq: 分桶粒度，可选 day、hour、minute
+        :param how: 聚合方法
+        :return: 聚合后的列式监控数据
+        """
+        return MonitorFrame([s.aggregate(freq, how) for s in self.series])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        转换为 DataFrame，供需要继续列式计算的调用方使用
+        :return: DataFrame
+        """
+        return pd.DataFrame({name: self.column(name) for name in self.columns})
+
+    def column_list(self, name: str) -> Optional[list]:
+        """
+        获取 python 对象列表形式的列，NaN 转为 None
+        :param name: 列名
+        :return: 列表，列不存在时返回 None
+        """
+        return self._to_list(self.column(name))
+
+    def to_records(self, columns: Optional[Dict[str, str]] = None) -> List[dict]:
+        """
+        转换为记录列表
+        :param columns: 输出字段到列名的映射，默认输出所有列
+        :return: 记录列表
+        """
+        columns = columns or {name: name for name in self.columns}
+        keys = tuple(columns)
+        n = len(self)
+        data = [self.column_list(name) or [None] * n for name in columns.values()]
+        return [dict(zip(keys, row)) for row in zip(*data)]
+
+    @staticmethod
+    def _to_list(column: Optional[np.ndarray]) -> Optional[list]:
+        """
+        将列数组转为 python 对象列表，NaN 转为 None
+        :param column: 列数组
+        :return: 列表
+        """
+        if column is None:
+            return None
+        if column.dtype.kind == 'f' and np.isnan(column).any():
+            return [None if v != v else v for v in column.tolist()]
+        return column.tolist()
+
+    @classmethod
+    def _series_records(cls, series: MonitorSeries, columns: Tuple[str, ...]) -> Iterator[dict]:
+        """
+        逐条生成单个时间序列的记录
+        :param series: 时间序列
+        :param columns: 列名
+        :return: 记录生成器
+        """
+        data = [cls._to_list(series.column(name)) for name in columns]
+        for row in zip(*data):
+            yield dict(zip(columns, row))
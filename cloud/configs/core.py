@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, Any
+from typing import Optional, Any, Iterator
 from yaml import load, FullLoader
 import os
 
@@ -48,6 +48,13 @@ class CloudConfig(metaclass=SingletonMeta):
         """
         return self._config.get(key, default)
 
+    def __iter__(self) -> Iterator[str]:
+        """
+        迭代所有云供应商标识
+        :return: 迭代器
+        """
+        return iter(self._config)
+
     def __getitem__(self, item: str) -> Any:
         """
         通过索引查询配置
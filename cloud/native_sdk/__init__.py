@@ -1,5 +1,9 @@
 from .abstract import *
+from .pool import *
+from .stream import *
 from .qcloud import *
 from .alicloud import *
 from .ucloud import *
-from .kscloud import *
\ No newline at end of file
+from .kscloud import *
+from .replay import *
+from .fake import *
@@ -1,6 +1,8 @@
-from typing import Optional, Union
+from typing import Optional, Union, Tuple
 from abc import ABC, abstractmethod
 from ..exceptions import CloudNativeSDKError
+from ..sdk.executor import io_executor
+import asyncio
 
 
 __all__ = ['AbstractNativeSDK']
@@ -18,13 +20,24 @@ class AbstractNativeSDK(ABC):
         # 请求相关信息
         self._interface = {}
         self._params = {}
+        self._compiled = {}
         self._already = False
 
-    def set(self, interface: dict, params: Optional[dict] = None) -> None:
+    @classmethod
+    def compile(cls, interface: dict) -> dict:
+        """
+        解析接口依赖的供应商请求类和客户端类，由注册表缓存后在 set() 时传入，避免每次请求动态加载
+        :param interface: 包含接口信息的字典
+        :return: 解析结果字典
+        """
+        return {}
+
+    def set(self, interface: dict, params: Optional[dict] = None, compiled: Optional[dict] = None) -> None:
         """
         设置请求必要的信息
         :param interface: 包含接口信息的字典
         :param params: 包含请求参数的字典
+        :param compiled: 接口的解析结果，未传入时即时解析
         """
         # 设置属性
         if interface:
@@ -39,6 +52,9 @@ class AbstractNativeSDK(ABC):
             if len(missing_param) > 0:
                 raise CloudNativeSDKError(f'param {missing_param} is required')
 
+        # 设置接口的解析结果
+        self._compiled = compiled if compiled is not None else self.compile(self._interface)
+
         # 设置可用标识
         self._already = True
 
@@ -50,6 +66,24 @@ class AbstractNativeSDK(ABC):
         """
         pass
 
+    def stream_request(self, data_path: Tuple[str, ...]) -> dict:
+        """
+        发送请求，增量解析响应，数据路径处的数组以迭代器的形式返回，数组之后的成员在迭代结束后合并到响应中
+        默认不支持增量解析，返回完整解析的响应，支持的 sdk 可覆盖该方法
+        :param data_path: 数据数组在响应中的路径
+        :return: 包含响应结果的字典
+        """
+        return self.request()
+
+    async def async_request(self) -> dict:
+        """
+        异步发送请求，返回响应结果
+        默认将阻塞的 request() 放入共享的 I/O 执行器中运行，原生支持异步的 sdk 可覆盖该方法
+        :return: 包含响应结果的字典
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(io_executor, self.request)
+
     @staticmethod
     def _standard_error_data(code: Union[str, int], message: str) -> dict:
         """
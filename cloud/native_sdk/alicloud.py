@@ -1,5 +1,7 @@
-from typing import Tuple
+from typing import Tuple, Union
 from .abstract import AbstractNativeSDK
+from .pool import client_pool
+from .stream import StreamedJSON
 from ..exceptions import CloudNativeSDKError
 from utils import dynamic_import_class, safe_json_loads
 from config import ALICLOUD_KEY
@@ -26,26 +28,65 @@ class ALiCloudNativeSDK(AbstractNativeSDK):
 
         # 默认地域，即使地域不起作用时，该 sdk 也必须传入地域参数
         self._default_region = 'cn-hangzhou'
+        # 增量解析时每块的字节数
+        self._stream_chunk_size = 65536
+
+    @classmethod
+    def compile(cls, interface: dict) -> dict:
+        """
+        解析接口的请求类
+        :param interface: 包含接口信息的字典
+        :return: 包含请求类的字典
+        """
+        name = interface['name']
+        md = interface['module']
+        version = interface['version']
+        req_class_path = f'aliyunsdk{md}.request.{version}.{name}Request.{name}Request'
+        return {'req_class': dynamic_import_class(req_class_path)}
 
     def request(self) -> dict:
         """
         使用原生 sdk 发送请求，返回响应结果
         :return: 包含响应结果的字典
         """
+        response = self._do_action()
+        if isinstance(response, dict):
+            return response
+        return safe_json_loads(response)
+
+    def stream_request(self, data_path: Tuple[str, ...]) -> dict:
+        """
+        发送请求，分块增量解析响应体，数据路径处的数组以迭代器的形式返回
+        原生 sdk 一次性返回响应体，增量解析避免同时持有完整的解析结果
+        :param data_path: 数据数组在响应中的路径
+        :return: 包含响应结果的字典
+        """
+        response = self._do_action()
+        if isinstance(response, dict):
+            return response
+        body = memoryview(response)
+        chunks = (body[i:i + self._stream_chunk_size] for i in range(0, len(body), self._stream_chunk_size))
+        return StreamedJSON(chunks, data_path).parse()
+
+    def _do_action(self) -> Union[bytes, dict]:
+        """
+        使用原生 sdk 发送请求
+        :return: 响应体，服务端错误时返回错误响应
+        """
         assert self._already, 'request info has not been set，should use self.set()'
 
+        # 服务端错误在借出期间转为错误响应，客户端照常归还，只有客户端错误时丢弃客户端
         request = self._get_req()
-        client = self._get_client()
         try:
-            response = client.do_action_with_exception(request)
-        except ServerException as e:
-            return self._build_error_data(e)
+            with client_pool.acquire(self._client_key, self._get_client) as client:
+                try:
+                    return client.do_action_with_exception(request)
+                except ServerException as e:
+                    return self._build_error_data(e)
         except ClientException as e:
             raise CloudNativeSDKError(
                 f'client error: {e.error_code}, {e.message}')
 
-        return safe_json_loads(response)
-
     @property
     def _ak_sk(self) -> Tuple[str, str]:
         """
@@ -54,32 +95,38 @@ class ALiCloudNativeSDK(AbstractNativeSDK):
         """
         return ALICLOUD_KEY
 
+    @property
+    def _region(self) -> str:
+        """
+        先查看请求参数中是否包含地域，否则取默认值
+        :return: 地域
+        """
+        return self._params.get('Region', self._default_region)
+
+    @property
+    def _client_key(self) -> tuple:
+        """
+        获取客户端在客户端池中的键
+        :return: 客户端键
+        """
+        return ('alicloud', self._interface['module'], self._interface['version'],
+                self._region, self._ak_sk[0])
+
     def _get_client(self) -> AcsClient:
         """
         生成客户端，并返回客户端对象
         :return: 客户端对象
         """
-        # 先查看请求参数中是否包含地域，否则取默认值
-        region = self._params.get('Region', self._default_region)
-        return AcsClient(self._ak_sk[0], self._ak_sk[1], region)
+        return AcsClient(self._ak_sk[0], self._ak_sk[1], self._region)
 
     def _get_req(self) -> AcsRequest:
         """
         生成请求对象
         :return: 请求对象
         """
-        # 提取接口信息
-        name = self._interface['name']
-        md = self._interface['module']
-        version = self._interface['version']
-
-        # 动态获取请求类
-        req_class_path = f'aliyunsdk{md}.request.{version}.{name}Request'
-        req_class_name = f'{name}Request'
-        req_class = dynamic_import_class(f'{req_class_path}.{req_class_name}')
-
-        # 实例化请求对象，并导入请求参数
-        assert req_class, f'request class {req_class_path}.{req_class_name} has not been import'
+        # 实例化解析得到的请求类，并导入请求参数
+        req_class = self._compiled['req_class']
+        assert req_class, f'request class of {self._interface["name"]} has not been import'
         request = req_class()
         request.set_query_params(self._params)
         request.set_accept_format("json")
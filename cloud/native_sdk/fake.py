@@ -0,0 +1,322 @@
+from typing import Dict, List, Optional, Tuple
+from threading import Lock, Thread
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from .abstract import AbstractNativeSDK
+from utils import safe_json_dumps
+import asyncio
+import json
+import math
+import random
+import time
+
+
+__all__ = ['FakeCloudProvider', 'FakeNativeSDK', 'FakeUCloudServer']
+
+
+class FakeCloudProvider:
+    """
+    合成的云供应商，用于在不访问真实账号的情况下对同步流程进行压测
+    按种子生成确定的资源清单，支持偏移和页码分页，并按配置注入延迟和限流错误
+    """
+
+    # 查询地域的接口
+    region_interfaces = ('DescribeRegions', 'GetRegion')
+
+    def __init__(self,
+                 total: int = 500000,
+                 regions: int = 30,
+                 seed: int = 0,
+                 data_key: str = 'InstanceSet',
+                 total_key: str = 'TotalCount',
+                 limit_str: str = 'Limit',
+                 offset_str: str = 'Offset',
+                 paging_base: str = 'offset',
+                 offset_init: int = 0,
+                 latency_median: float = 0,
+                 latency_sigma: float = 0,
+                 throttle_rate: float = 0,
+                 max_rps: float = 0,
+                 throttle_codes: Optional[List[str]] = None) -> None:
+        """
+        初始化
+        :param total: 所有地域的记录总数
+        :param regions: 地域数
+        :param seed: 随机种子，决定各地域的记录数和注入的结果
+        :param data_key: 响应中记录列表的键
+        :param total_key: 响应中记录总数的键
+        :param limit_str: 分页大小参数
+        :param offset_str: 分页位置参数
+        :param paging_base: 分页方式，offset 按偏移；page 按页码
+        :param offset_init: 分页位置的初始值
+        :param latency_median: 延迟的中位数，单位秒，延迟服从对数正态分布
+        :param latency_sigma: 延迟对数的标准差，为 0 时延迟固定为中位数
+        :param throttle_rate: 随机注入限流错误的比例
+        :param max_rps: 每秒最多处理的请求数，超出时返回限流错误，为 0 时不限制
+        :param throttle_codes: 限流错误码
+        """
+        self.data_key = data_key
+        self.total_key = total_key
+        self._limit_str = limit_str
+        self._offset_str = offset_str
+        self._paging_base = paging_base
+        self._offset_init = offset_init
+        self._latency_median = latency_median
+        self._latency_sigma = latency_sigma
+        self._throttle_rate = throttle_rate
+        self._max_rps = max_rps
+        self._throttle_codes = throttle_codes or ['RequestLimitExceeded']
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._window = (0, 0)
+
+        # 按随机权重把记录总数分配到各地域，余数分配给前面的地域
+        self.regions = [f'fake-region-{i:02d}' for i in range(regions)]
+        weights = [self._random.random() for _ in self.regions]
+        counts = [int(total * w / sum(weights)) for w in weights]
+        for i in range(total - sum(counts)):
+            counts[i % regions] += 1
+        self._counts = dict(zip(self.regions, counts))
+
+    def count(self, region: Optional[str]) -> int:
+        """
+        获取地域的记录数
+        :param region: 地域
+        :return: 记录数，未知地域为 0
+        """
+        return self._counts.get(region, 0)
+
+    def handle(self, interface: str, params: dict) -> Tuple[Optional[str], dict]:
+        """
+        处理一次请求
+        :param interface: 接口名
+        :param params: 请求参数
+        :return: 错误码和响应组成的元组，成功时错误码为 None
+        """
+        code = self._get_throttle_code()
+        if code:
+            return code, {}
+
+        if interface in self.region_interfaces:
+            data = [{'Region': r, 'RegionName': r, 'RegionState': 'AVAILABLE'} for r in self.regions]
+            return None, {self.total_key: len(data), self.data_key: data}
+
+        region = params.get('Region')
+        limit = int(params.get(self._limit_str, 20))
+        position = int(params.get(self._offset_str, self._offset_init)) - self._offset_init
+        offset = position * limit if self._paging_base == 'page' else position
+        total = self.count(region)
+        data = [self._build_record(region, i) for i in range(offset, min(offset + limit, total))]
+        return None, {self.total_key: total, self.data_key: data}
+
+    def get_latency(self) -> float:
+        """
+        获取本次请求注入的延迟
+        :return: 延迟，单位秒
+        """
+        if not self._latency_sigma:
+            return self._latency_median
+        with self._lock:
+            gauss = self._random.gauss(0, self._latency_sigma)
+        return self._latency_median * math.exp(gauss)
+
+    def _get_throttle_code(self) -> Optional[str]:
+        """
+        判断本次请求是否被限流，超出每秒请求数或随机命中时限流
+        :return: 限流错误码，未限流时为 None
+        """
+        with self._lock:
+            if self._max_rps:
+                second = int(time.monotonic())
+                start, count = self._window
+                count = count + 1 if start == second else 1
+                self._window = (second, count)
+                if count > self._max_rps:
+                    return self._random.choice(self._throttle_codes)
+            if self._throttle_rate and self._random.random() < self._throttle_rate:
+                return self._random.choice(self._throttle_codes)
+        return None
+
+    @staticmethod
+    def _build_record(region: str, index: int) -> dict:
+        """
+        生成单条记录，相同地域和序号的记录总是相同
+        :param region: 地域
+        :param index: 序号
+        :return: 记录
+        """
+        return {
+            'InstanceId': f'ins-{region}-{index:08d}',
+            'InstanceName': f'fake-{index:08d}',
+            'InstanceState': 'RUNNING',
+            'ProjectId': index % 10,
+            'PrivateIpAddresses': [f'10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}'],
+            'PublicIpAddresses': [],
+            'Placement': {'Zone': f'{region}-{index % 3 + 1}', 'ProjectId': index % 10}
+        }
+
+
+# 以配置为键的合成供应商，相同配置的原生 sdk 对象共享清单、随机序列和限流窗口
+_providers: Dict[str, FakeCloudProvider] = {}
+_providers_lock = Lock()
+
+
+def _get_provider(**options) -> FakeCloudProvider:
+    """
+    获取相同配置共享的合成供应商
+    :param options: 合成供应商的初始化参数
+    :return: 合成供应商
+    """
+    key = json.dumps(options, sort_keys=True, default=str)
+    with _providers_lock:
+        if key not in _providers:
+            _providers[key] = FakeCloudProvider(**options)
+        return _providers[key]
+
+
+class FakeNativeSDK(AbstractNativeSDK):
+    """
+    进程内的合成原生 sdk，通过 native_sdk_options 设置合成供应商的参数
+    """
+
+    def __init__(self, **options) -> None:
+        """
+        初始化
+        :param options: 合成供应商的初始化参数
+        """
+        super().__init__()
+        self._provider = _get_provider(**options)
+
+    def request(self) -> dict:
+        """
+        向合成供应商发送请求，返回响应结果
+        :return: 包含响应结果的字典
+        """
+        assert self._already, 'request info has not been set，should use self.set()'
+
+        time.sleep(self._provider.get_latency())
+        return self._build_resp()
+
+    async def async_request(self) -> dict:
+        """
+        异步发送请求，延迟不占用线程
+        :return: 包含响应结果的字典
+        """
+        assert self._already, 'request info has not been set，should use self.set()'
+
+        await asyncio.sleep(self._provider.get_latency())
+        return self._build_resp()
+
+    def _build_resp(self) -> dict:
+        """
+        构造响应，错误时构造标准的错误响应
+        :return: 响应字典
+        """
+        code, resp = self._provider.handle(self._interface['name'], self._params)
+        if code:
+            return self._standard_error_data(code, 'throttled by fake provider')
+        return resp
+
+
+class FakeUCloudServer:
+    """
+    本地 HTTP 合成供应商，使用优刻得风格的查询字符串接口和记录，可作为 UCloudNativeSDK 的调用地址
+    错误响应使用非 0 的 RetCode 和 Message 表示，不校验签名
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options) -> None:
+        """
+        初始化
+        :param host: 监听地址
+        :param port: 监听端口，为 0 时随机选择
+        :param options: 合成供应商的初始化参数，记录列表的键默认为 UHostSet
+        """
+        options.setdefault('data_key', 'UHostSet')
+        self.provider = FakeCloudProvider(**options)
+        self._server = ThreadingHTTPServer((host, port), self._get_handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        获取调用地址
+        """
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self) -> 'FakeUCloudServer':
+        """
+        在守护线程中启动服务
+        :return: 服务对象
+        """
+        self._thread = Thread(target=self._server.serve_forever, name='fake-ucloud', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        停止服务
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeUCloudServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _get_handler_class(self) -> type:
+        """
+        构造绑定到当前合成供应商的请求处理类
+        :return: 请求处理类
+        """
+        provider = self.provider
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+                params = dict(parse_qsl(urlsplit(self.path).query))
+                action = params.pop('Action', '')
+                time.sleep(provider.get_latency())
+
+                code, resp = provider.handle(action, params)
+                if code:
+                    resp = {'RetCode': code, 'Message': 'throttled by fake provider'}
+                else:
+                    # 地域列表使用 Regions 键，主机列表转为优刻得主机的字段
+                    data = resp.pop(provider.data_key)
+                    if action in provider.region_interfaces:
+                        resp['Regions'] = data
+                    else:
+                        resp[provider.data_key] = [FakeUCloudServer._to_ucloud_record(r) for r in data]
+                    resp = {'RetCode': 0, 'Action': f'{action}Response', **resp}
+
+                body = safe_json_dumps(resp).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    @staticmethod
+    def _to_ucloud_record(record: dict) -> dict:
+        """
+        将合成的记录转为优刻得主机的字段
+        :param record: 合成的记录
+        :return: 优刻得风格的记录
+        """
+        return {
+            'UHostId': record['InstanceId'],
+            'Name': record['InstanceName'],
+            'State': 'Running',
+            'Zone': record['Placement']['Zone'],
+            'Tag': f'project-{record["ProjectId"]}',
+            'IPSet': [{'Type': 'Private', 'IP': ip} for ip in record['PrivateIpAddresses']]
+        }
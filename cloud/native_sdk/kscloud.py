@@ -1,5 +1,6 @@
-from typing import Tuple
+from typing import Tuple, Any
 from .abstract import AbstractNativeSDK
+from .pool import client_pool
 from ..exceptions import CloudNativeSDKError
 from config import KSCLOUD_KEY
 
@@ -37,21 +38,32 @@ class KSCloudNativeSDK(AbstractNativeSDK):
 
         # 先查看请求参数中是否包含地域，否则取默认值
         region = self._params.get('Region', self._default_region)
-        session = get_session()
-        client = session.create_client(self._interface['module'],
-                                       region_name=region,
-                                       ks_access_key_id=self._ak_sk[0],
-                                       ks_secret_access_key=self._ak_sk[1])
+        key = ('kscloud', self._interface['module'], None, region, self._ak_sk[0])
 
+        # 服务端错误在借出期间转为错误响应，客户端照常归还，只有客户端错误时丢弃客户端
         try:
-            resp = getattr(client, self._interface['name'])()
+            with client_pool.acquire(key, lambda: self._get_client(region)) as client:
+                try:
+                    resp = getattr(client, self._interface['name'])()
+                except ClientError as e:
+                    return self._build_error_data(e)
         except KSCoreError as e:
             raise CloudNativeSDKError(f'client error: {e.args[0]}')
-        except ClientError as e:
-            return self._build_error_data(e)
 
         return resp
 
+    def _get_client(self, region: str) -> Any:
+        """
+        生成客户端，并返回客户端对象
+        :param region: 地域
+        :return: 客户端对象
+        """
+        session = get_session()
+        return session.create_client(self._interface['module'],
+                                     region_name=region,
+                                     ks_access_key_id=self._ak_sk[0],
+                                     ks_secret_access_key=self._ak_sk[1])
+
     @property
     def _ak_sk(self) -> Tuple[str, str]:
         """
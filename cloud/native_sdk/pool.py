@@ -0,0 +1,157 @@
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+from contextlib import contextmanager
+from threading import Lock
+import time
+
+
+__all__ = ['NativeClientPool', 'client_pool']
+
+
+class NativeClientPool:
+    """
+    线程安全的原生客户端池，按 (供应商, 模块, 版本, 地域, 密钥) 复用长期存活的客户端
+    客户端被借出期间由单个线程独占，归还后可被其他请求复用，空闲过久则被回收
+    """
+
+    def __init__(self, idle_timeout: float = 300, max_idle: int = 64) -> None:
+        """
+        初始化
+        :param idle_timeout: 空闲超时时间，单位秒
+        :param max_idle: 每个键保留的最大空闲客户端数
+        """
+        self._idle_timeout = idle_timeout
+        self._max_idle = max_idle
+        self._idle: Dict[Hashable, List[Tuple[float, Any]]] = {}
+        self._last_evicted = time.monotonic()
+        self._lock = Lock()
+
+    @contextmanager
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Iterator[Any]:
+        """
+        借出客户端，不存在空闲客户端时通过工厂函数创建，使用结束后自动归还
+        使用过程中抛出异常的客户端不再归还，避免复用损坏的连接
+        因此服务端返回的错误（如限流）应在借出期间转为错误响应，不应抛出到借出范围之外
+        :param key: 客户端键
+        :param factory: 创建客户端的函数
+        :return: 客户端
+        """
+        client = self.checkout(key, factory)
+        try:
+            yield client
+        except BaseException:
+            self.checkin(key, client, broken=True)
+            raise
+        else:
+            self.checkin(key, client)
+
+    def checkout(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        借出客户端，不存在空闲客户端时通过工厂函数创建
+        由调用方通过 checkin() 归还，用于借出期间跨越多次调用的场景，如流式读取响应体
+        :param key: 客户端键
+        :param factory: 创建客户端的函数
+        :return: 客户端
+        """
+        client = self._checkout(key)
+        if client is None:
+            client = factory()
+        return client
+
+    def checkin(self, key: Hashable, client: Any, broken: bool = False) -> None:
+        """
+        归还借出的客户端，损坏的客户端直接关闭
+        :param key: 客户端键
+        :param client: 客户端
+        :param broken: 是否已损坏
+        """
+        if broken:
+            self._close(client)
+        else:
+            self._checkin(key, client)
+
+    def clear(self) -> None:
+        """
+        关闭并清空所有空闲客户端
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for clients in idle.values():
+            for _, client in clients:
+                self._close(client)
+
+    @property
+    def idle_count(self) -> int:
+        """
+        获取空闲客户端总数
+        """
+        with self._lock:
+            return sum(len(clients) for clients in self._idle.values())
+
+    def _checkout(self, key: Hashable) -> Any:
+        """
+        取出最近归还的空闲客户端，并回收空闲超时的客户端
+        :param key: 客户端键
+        :return: 客户端，不存在时返回 None
+        """
+        expired = []
+        client = None
+        with self._lock:
+            expired.extend(self._evict(time.monotonic()))
+            clients = self._idle.get(key)
+            if clients:
+                _, client = clients.pop()
+
+        for c in expired:
+            self._close(c)
+        return client
+
+    def _checkin(self, key: Hashable, client: Any) -> None:
+        """
+        归还客户端，超过最大空闲数时直接关闭
+        :param key: 客户端键
+        :param client: 客户端
+        """
+        with self._lock:
+            clients = self._idle.setdefault(key, [])
+            if len(clients) < self._max_idle:
+                clients.append((time.monotonic(), client))
+                return
+        self._close(client)
+
+    def _evict(self, now: float) -> List[Any]:
+        """
+        移除空闲超时的客户端，需在持有锁时调用，为避免频繁遍历，间隔一定时间才执行
+        :param now: 当前时间
+        :return: 被移除的客户端列表
+        """
+        expired = []
+        if now - self._last_evicted < self._idle_timeout / 10:
+            return expired
+        self._last_evicted = now
+
+        for key in list(self._idle):
+            clients = self._idle[key]
+            alive = [(t, c) for t, c in clients if now - t < self._idle_timeout]
+            expired.extend(c for t, c in clients if now - t >= self._idle_timeout)
+            if alive:
+                self._idle[key] = alive
+            else:
+                del self._idle[key]
+        return expired
+
+    @staticmethod
+    def _close(client: Any) -> None:
+        """
+        关闭客户端持有的连接
+        :param client: 客户端
+        """
+        close = getattr(client, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+
+# 外部使用的实例，进程内所有原生 sdk 共享
+client_pool = NativeClientPool()
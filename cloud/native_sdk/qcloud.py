@@ -1,5 +1,6 @@
 from typing import Tuple, List
 from .abstract import AbstractNativeSDK
+from .pool import client_pool
 from ..exceptions import CloudNativeSDKError
 from utils import dynamic_import_class, safe_json_dumps, safe_json_loads
 from config import QCLOUD_KEY
@@ -36,6 +37,21 @@ class QCloudNativeSDK(AbstractNativeSDK):
         self._http_config = None
         self._client_config = None
 
+    @classmethod
+    def compile(cls, interface: dict) -> dict:
+        """
+        解析新版 sdk 接口的客户端类和请求类，老版 sdk 接口不需要解析
+        :param interface: 包含接口信息的字典
+        :return: 包含客户端类和请求类的字典
+        """
+        name = interface['name']
+        md = interface['module']
+        version = interface['version']
+        return {
+            'client_class': dynamic_import_class(f'tencentcloud.{md}.{version}.{md}_client.{md.capitalize()}Client'),
+            'req_class': dynamic_import_class(f'tencentcloud.{md}.{version}.models.{name}Request')
+        }
+
     def request(self) -> dict:
         """
         使用原生 sdk 发送请求，返回响应结果，根据接口区分使用新老两版 sdk
@@ -57,17 +73,22 @@ class QCloudNativeSDK(AbstractNativeSDK):
         使用新版 sdk 发送请求，返回响应结果
         :return: 包含响应结果的字典
         """
-        # 分别获取客户端对象、请求对象
-        client = self._get_client()
+        # 分别获取请求对象、客户端对象，客户端从客户端池中借出
         req = self._get_req()
+        key = ('qcloud', self._interface['module'], self._interface['version'],
+               self._params.get('Region'), self._ak_sk[0])
 
-        # 进行请求，得到响应
+        # 进行请求，得到响应，服务端错误在借出期间转为错误响应，客户端照常归还
         try:
-            resp = getattr(client, self._interface['name'])(req)
+            with client_pool.acquire(key, self._get_client) as client:
+                try:
+                    resp = getattr(client, self._interface['name'])(req)
+                except TencentCloudSDKException as e:
+                    if not e.requestId:
+                        raise
+                    return self._build_error_data(e)
         except TencentCloudSDKException as e:
-            if not e.requestId:
-                raise CloudNativeSDKError(f'client error: {e.message}')
-            return self._build_error_data(e)
+            raise CloudNativeSDKError(f'client error: {e.message}')
 
         # 将结果反序列化为对象并输出
         return safe_json_loads(resp.to_json_string())
@@ -82,16 +103,21 @@ class QCloudNativeSDK(AbstractNativeSDK):
             'secretId': self._ak_sk[0],
             'secretKey': self._ak_sk[1]
         })
-        client = QcloudApi(self._interface['module'], secret_params)
-        client.generateUrl(self._interface['name'], self._params)
+        key = ('qcloud', self._interface['module'], None, None, self._ak_sk[0])
 
-        # 进行请求，得到响应
+        # 进行请求，得到响应，服务端错误在借出期间转为错误响应，客户端照常归还
         try:
-            resp = client.call(self._interface['name'], self._params)
+            with client_pool.acquire(
+                    key, lambda: QcloudApi(self._interface['module'], secret_params)) as client:
+                try:
+                    client.generateUrl(self._interface['name'], self._params)
+                    resp = client.call(self._interface['name'], self._params)
+                except TencentCloudSDKException as e:
+                    if not e.requestId:
+                        raise
+                    return self._build_error_data(e)
         except TencentCloudSDKException as e:
-            if not e.requestId:
-                raise CloudNativeSDKError(f'client error: {e.message}')
-            return self._build_error_data(e)
+            raise CloudNativeSDKError(f'client error: {e.message}')
 
         # 将结果反序列化为对象并输出
         return safe_json_loads(resp)
@@ -130,36 +156,17 @@ class QCloudNativeSDK(AbstractNativeSDK):
                 self._http_config = self._get_http_config()
             self._client_config = ClientProfile(httpProfile=self._http_config)
 
-        # 获取接口信息
-        md = self._interface['module']
-        version = self._interface['version']
-
-        # 动态获取客户端类
-        client_module_path = f'tencentcloud.{md}.{version}.{md}_client'
-        client_class_name = f'{md.capitalize()}Client'
-        client_class = dynamic_import_class(
-            f'{client_module_path}.{client_class_name}')
-
-        # 实例化客户端对象
+        # 实例化解析得到的客户端类
         region = self._params.get('Region')
-        return client_class(self._credential, region, self._client_config)
+        return self._compiled['client_class'](self._credential, region, self._client_config)
 
     def _get_req(self) -> AbstractModel:
         """
         生成请求对象
         :return: 请求对象
         """
-        # 获取接口信息
-        name = self._interface['name']
-        md = self._interface['module']
-        version = self._interface['version']
-
-        # 动态获取请求类
-        req_class_path = f'tencentcloud.{md}.{version}.models'
-        req_class_name = f'{name}Request'
-        req_class = dynamic_import_class(f'{req_class_path}.{req_class_name}')
-
-        # 实例化请求对象，并导入请求参数
+        # 实例化解析得到的请求类，并导入请求参数
+        req_class = self._compiled['req_class']
         assert req_class, 'request class has not been import, check cloud_interface object'
         req = req_class()
         param_json = safe_json_dumps(self._params)
@@ -181,6 +188,6 @@ class QCloudNativeSDK(AbstractNativeSDK):
         :param e: 异常对象
         :return: 响应字典
         """
-        code = e.code or 'Unknown',
+        code = e.code or 'Unknown'
         msg = e.message or 'Unknown'
         return self._standard_error_data(code, msg)
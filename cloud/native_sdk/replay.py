@@ -0,0 +1,175 @@
+from typing import Dict, List, Optional, Union
+from django.conf import settings
+from .abstract import AbstractNativeSDK
+from ..exceptions import CloudNativeSDKError
+from utils import dynamic_import_class, safe_json_dumps, safe_json_loads
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+
+
+__all__ = ['ReplayNativeSDK']
+
+
+# 以随机种子为键的随机数生成器，同一种子的实例共享序列，保证注入的结果可复现
+_randoms: Dict[Optional[int], random.Random] = {}
+
+
+class ReplayNativeSDK(AbstractNativeSDK):
+    """
+    录制回放的原生 sdk，用于无网络环境下的确定性运行和基准测试
+    录制时调用真实的原生 sdk 并把响应保存为磁带文件，回放时从磁带文件读取响应
+    磁带以接口和规范化的请求参数为键，回放时可注入延迟和错误
+    """
+
+    def __init__(self,
+                 target: Optional[str] = None,
+                 mode: str = 'replay',
+                 cassette_dir: Optional[str] = None,
+                 latency: float = 0,
+                 latency_jitter: float = 0,
+                 error_rate: float = 0,
+                 error_codes: Optional[List[str]] = None,
+                 seed: Optional[int] = None) -> None:
+        """
+        初始化
+        :param target: 被录制的原生 sdk 类，为 cloud.native_sdk 下的相对路径或完整路径，录制时必须设置
+        :param mode: 模式，record 录制；replay 回放；auto 存在磁带时回放，否则录制
+        :param cassette_dir: 磁带目录，默认为项目目录下的 cassettes
+        :param latency: 回放时注入的固定延迟，单位秒
+        :param latency_jitter: 回放时在固定延迟上叠加的随机延迟的上限，单位秒
+        :param error_rate: 回放时注入错误响应的比例
+        :param error_codes: 注入错误响应时随机选用的错误码
+        :param seed: 随机种子
+        """
+        super().__init__()
+
+        if mode not in ('record', 'replay', 'auto'):
+            raise CloudNativeSDKError(f'replay mode {mode} is not supported')
+
+        self._target = target
+        self._mode = mode
+        self._cassette_dir = cassette_dir or os.path.join(settings.BASE_DIR, 'cassettes')
+        self._latency = latency
+        self._latency_jitter = latency_jitter
+        self._error_rate = error_rate
+        self._error_codes = error_codes or ['InternalError']
+        self._random = _randoms.setdefault(seed, random.Random(seed))
+
+    def request(self) -> dict:
+        """
+        回放或录制响应
+        :return: 包含响应结果的字典
+        """
+        assert self._already, 'request info has not been set，should use self.set()'
+
+        cassette = self._load()
+        if cassette is None:
+            return self._record()
+
+        time.sleep(self._get_latency())
+        return self._inject(cassette)
+
+    async def async_request(self) -> dict:
+        """
+        异步回放或录制响应，回放时的延迟不占用线程
+        :return: 包含响应结果的字典
+        """
+        assert self._already, 'request info has not been set，should use self.set()'
+
+        cassette = self._load()
+        if cassette is None:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self._record)
+
+        await asyncio.sleep(self._get_latency())
+        return self._inject(cassette)
+
+    @property
+    def cassette_file(self) -> str:
+        """
+        获取当前请求对应的磁带文件路径
+        """
+        key = json.dumps([
+            self._interface.get('module'),
+            self._interface.get('version'),
+            self._interface.get('name'),
+            self._params
+        ], sort_keys=True, default=str)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self._cassette_dir, str(self._interface.get('name')), f'{digest}.json')
+
+    def _load(self) -> Optional[dict]:
+        """
+        读取磁带中的响应，录制模式下总是返回 None
+        :return: 响应，不存在时回放模式下返回错误响应，自动模式下返回 None
+        """
+        if self._mode == 'record':
+            return None
+
+        if not os.path.exists(self.cassette_file):
+            if self._mode == 'auto':
+                return None
+            return self._standard_error_data(
+                'CassetteNotFound', f'cassette of {self._interface.get("name")} is not recorded')
+
+        with open(self.cassette_file) as f:
+            return safe_json_loads(f.read()).get('response')
+
+    def _record(self) -> dict:
+        """
+        调用被录制的原生 sdk，并将响应保存为磁带文件
+        :return: 包含响应结果的字典
+        """
+        target_class = self._get_target_class()
+        native_sdk = target_class()
+        native_sdk.set(self._interface, self._params)
+        resp = native_sdk.request()
+
+        cassette = {
+            'interface': self._interface.get('name'),
+            'params': self._params,
+            'response': resp
+        }
+        os.makedirs(os.path.dirname(self.cassette_file), exist_ok=True)
+        tmp_file = f'{self.cassette_file}.tmp'
+        with open(tmp_file, 'w') as f:
+            f.write(safe_json_dumps(cassette))
+        os.replace(tmp_file, self.cassette_file)
+        return resp
+
+    def _get_target_class(self) -> type:
+        """
+        获取被录制的原生 sdk 类
+        :return: 原生 sdk 类
+        """
+        if not self._target:
+            raise CloudNativeSDKError('target native sdk is required for recording')
+        target_class = dynamic_import_class(f'cloud.native_sdk.{self._target}') or \
+            dynamic_import_class(self._target)
+        if not target_class:
+            raise CloudNativeSDKError(f'target native sdk {self._target} is not found')
+        return target_class
+
+    def _get_latency(self) -> float:
+        """
+        获取本次回放注入的延迟
+        :return: 延迟，单位秒
+        """
+        if not self._latency_jitter:
+            return self._latency
+        return self._latency + self._random.uniform(0, self._latency_jitter)
+
+    def _inject(self, resp: Union[dict, list]) -> dict:
+        """
+        按比例注入错误响应
+        :param resp: 磁带中的响应
+        :return: 响应或注入的错误响应
+        """
+        if self._error_rate and self._random.random() < self._error_rate:
+            code = self._random.choice(self._error_codes)
+            return self._standard_error_data(code, 'injected by replay native sdk')
+        return resp
@@ -0,0 +1,194 @@
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+from ..exceptions import CloudNativeSDKError
+import codecs
+import json
+
+
+__all__ = ['StreamedJSON']
+
+
+class StreamedJSON:
+    """
+    增量解析的 JSON 文档，数据路径处的数组以迭代器的形式逐个元素解析，不保存整个文档
+    解析时只持有未消费的输入和当前元素，数组之后的成员在数组迭代结束后合并到文档中
+    """
+
+    # JSON 中的空白字符
+    whitespace = ' \t\n\r'
+
+    def __init__(self,
+                 chunks: Iterable[Union[bytes, str]],
+                 path: Sequence[str],
+                 on_close: Optional[Callable[[], Any]] = None) -> None:
+        """
+        初始化
+        :param chunks: 文档的输入块
+        :param path: 数据数组在文档中的路径，每层均为对象的键
+        :param on_close: 解析结束或中止时的回调，用于释放连接
+        """
+        self._chunks = iter(chunks)
+        self._path = tuple(path)
+        self._on_close = on_close
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        # 数据路径上已打开的对象，数组之后的成员逐层合并
+        self._stack: List[dict] = []
+
+    def parse(self) -> dict:
+        """
+        解析至数据数组的开始处，返回文档，数据数组以迭代器的形式放在数据路径处
+        文档中不存在数据路径时返回完整的文档
+        :return: 文档
+        """
+        try:
+            doc = {}
+            self._expect('{')
+            self._stack.append(doc)
+            if not self._parse_members(doc, 0):
+                self._close()
+            return doc
+        except (ValueError, UnicodeDecodeError) as e:
+            self._close()
+            raise CloudNativeSDKError(f'stream parse error: {e}')
+
+    def _parse_members(self, obj: dict, depth: int) -> bool:
+        """
+        解析对象的成员，直到对象结束或数据数组开始
+        :param obj: 保存成员的对象
+        :param depth: 对象在数据路径中的层次
+        :return: 是否停在数据数组的开始处
+        """
+        while True:
+            c = self._peek()
+            if c == '}':
+                self._pos += 1
+                return False
+            if c == ',':
+                self._pos += 1
+
+            key = self._decode_value()
+            self._expect(':')
+
+            # 数据路径上的键，最后一层为数组时停止，中间层为对象时进入
+            if depth < len(self._path) and key == self._path[depth]:
+                c = self._peek()
+                if depth == len(self._path) - 1 and c == '[':
+                    self._pos += 1
+                    obj[key] = self._iter_array()
+                    return True
+                if depth < len(self._path) - 1 and c == '{':
+                    self._pos += 1
+                    child = obj[key] = {}
+                    self._stack.append(child)
+                    if self._parse_members(child, depth + 1):
+                        return True
+                    self._stack.pop()
+                    continue
+
+            obj[key] = self._decode_value()
+
+    def _iter_array(self) -> Iterator[Any]:
+        """
+        逐个解析数据数组的元素，数组结束后继续解析路径上各层对象剩余的成员
+        :return: 元素迭代器
+        """
+        try:
+            while True:
+                c = self._peek()
+                if c == ']':
+                    self._pos += 1
+                    break
+                if c == ',':
+                    self._pos += 1
+                    continue
+                yield self._decode_value()
+
+            while self._stack:
+                self._parse_members(self._stack.pop(), len(self._path))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CloudNativeSDKError(f'stream parse error: {e}')
+        finally:
+            self._close()
+
+    def _peek(self) -> str:
+        """
+        跳过空白，返回下一个字符
+        :return: 字符
+        """
+        while True:
+            buf, pos = self._buf, self._pos
+            n = len(buf)
+            while pos < n and buf[pos] in self.whitespace:
+                pos += 1
+            self._pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self._fill():
+                raise ValueError('unexpected end of document')
+
+    def _expect(self, c: str) -> None:
+        """
+        消费指定的字符
+        :param c: 字符
+        """
+        found = self._peek()
+        if found != c:
+            raise ValueError(f'expecting {c!r} at {self._pos}, found {found!r}')
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """
+        解析一个完整的值，输入不足时继续读取
+        值结束于缓冲区末尾时无法确定数字是否完整，同样继续读取
+        :return: 值
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buf, self._pos)
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill(grow=True)
+
+    def _fill(self, grow: bool = False) -> bool:
+        """
+        读取输入并丢弃已消费的部分
+        :param grow: 是否读取至未消费的部分翻倍，避免大的值被反复解析
+        :return: 是否读取到输入
+        """
+        if self._eof:
+            return False
+
+        pending = [self._buf[self._pos:]]
+        target = len(pending[0]) if grow else 0
+        size = 0
+        while True:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                pending.append(self._text_decoder.decode(b'', final=True))
+                break
+            text = self._text_decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+            pending.append(text)
+            size += len(text)
+            if size and size >= target:
+                break
+
+        self._buf = ''.join(pending)
+        self._pos = 0
+        return size > 0 or not self._eof
+
+    def _close(self) -> None:
+        """
+        结束解析，调用结束回调
+        """
+        if self._on_close:
+            on_close, self._on_close = self._on_close, None
+            on_close()
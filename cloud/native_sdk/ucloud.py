@@ -1,8 +1,13 @@
-from typing import Optional, Tuple, Any
+from typing import Tuple, Any, Iterator
 from .abstract import AbstractNativeSDK
+from .pool import client_pool
+from .stream import StreamedJSON
+from ..exceptions import CloudNativeSDKError
+import asyncio
 import hashlib
 import requests
 from collections import OrderedDict
+from urllib.parse import urlsplit, quote
 from utils import safe_json_loads
 from config import UCLOUD_KEY
 
@@ -16,14 +21,22 @@ class UCloudNativeSDK(AbstractNativeSDK):
     https://docs.ucloud.cn/api/summary/overview
     """
 
-    def __init__(self) -> None:
+    def __init__(self,
+                 url: str = 'http://api.ucloud.cn/',
+                 timeout: Tuple[float, float] = (3, 30)) -> None:
         """
         特有初始化
+        :param url: 调用地址，可指向本地的合成供应商
+        :param timeout: 连接超时和读取超时，单位秒
         """
         super().__init__()
 
         # 调用地址
-        self._url = 'http://api.ucloud.cn/'
+        self._url = url
+        # 连接超时和读取超时，单位秒
+        self._timeout = tuple(timeout)
+        # 增量解析时每块的字节数
+        self._stream_chunk_size = 65536
 
     def request(self) -> dict:
         """
@@ -32,19 +45,144 @@ class UCloudNativeSDK(AbstractNativeSDK):
         """
         assert self._already, 'request info has not been set，should use self.set()'
 
-        url = self._url + self._build_url_params() + '&Signature=' + \
-            self._get_signature()
+        url = self._build_url()
+        key = ('ucloud', None, None, None, self._ak_sk[0])
         try:
-            resp = requests.get(url, timeout=(3, 30))
-            data = safe_json_loads(resp.content)
+            with client_pool.acquire(key, requests.Session) as session:
+                resp = session.get(url, timeout=self._timeout)
+            data = self._check_resp(safe_json_loads(resp.content))
         except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout):
-            resp = {
-                'RetCode': '502',
-                'Message': 'request timeout'
-            }
-            data = self._build_error_data(resp)
+            data = self._build_timeout_error_data()
         return data
 
+    def stream_request(self, data_path: Tuple[str, ...]) -> dict:
+        """
+        以流的方式读取响应体并增量解析，数据路径处的数组以迭代器的形式返回
+        会话在响应体读取完毕或中止后才关闭响应并归还给客户端池，读取期间不会被其他请求复用
+        读取数组期间的超时以 CloudNativeSDKError 抛出
+        :param data_path: 数据数组在响应中的路径
+        :return: 包含响应结果的字典
+        """
+        assert self._already, 'request info has not been set，should use self.set()'
+
+        url = self._build_url()
+        key = ('ucloud', None, None, None, self._ak_sk[0])
+        session = client_pool.checkout(key, requests.Session)
+        try:
+            resp = session.get(url, timeout=self._timeout, stream=True)
+        except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout):
+            client_pool.checkin(key, session, broken=True)
+            return self._build_timeout_error_data()
+        except BaseException:
+            client_pool.checkin(key, session, broken=True)
+            raise
+
+        released = []
+
+        def release() -> None:
+            if not released:
+                released.append(True)
+                resp.close()
+                client_pool.checkin(key, session)
+
+        try:
+            data = StreamedJSON(self._iter_content(resp), data_path, release).parse()
+        except BaseException:
+            release()
+            raise
+
+        # 错误响应中没有数据数组，此时已解析完毕
+        if data.get('RetCode', 0) != 0:
+            release()
+        return self._check_resp(data)
+
+    def _iter_content(self, resp: requests.Response) -> Iterator[bytes]:
+        """
+        分块读取响应体，读取超时转为原生 sdk 异常
+        :param resp: 流式响应
+        :return: 响应体的块
+        """
+        try:
+            yield from resp.iter_content(self._stream_chunk_size)
+        except requests.exceptions.RequestException as e:
+            raise CloudNativeSDKError(f'stream read error: {e}')
+
+    async def async_request(self) -> dict:
+        """
+        使用 asyncio 原生连接异步发送请求，返回响应结果
+        :return: 包含响应结果的字典
+        """
+        assert self._already, 'request info has not been set，should use self.set()'
+
+        url = self._build_url()
+        try:
+            content = await self._async_get(url)
+            data = self._check_resp(safe_json_loads(content))
+        except asyncio.TimeoutError:
+            data = self._build_timeout_error_data()
+        return data
+
+    async def _async_get(self, url: str) -> bytes:
+        """
+        基于 asyncio 流实现的 HTTP/1.1 GET 请求，返回响应体
+        :param url: 请求地址
+        :return: 响应体
+        """
+        parts = urlsplit(url)
+        use_ssl = parts.scheme == 'https'
+        port = parts.port or (443 if use_ssl else 80)
+        target = quote(parts.path or '/', safe='/') + '?' + \
+            quote(parts.query, safe="!#$%&'()*+,/:;=?@[]~")
+
+        # 分别控制连接超时和读取超时
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=use_ssl or None),
+            self._timeout[0])
+        try:
+            writer.write((
+                f'GET {target} HTTP/1.1\r\n'
+                f'Host: {parts.hostname}\r\n'
+                f'Accept: application/json\r\n'
+                f'Accept-Encoding: identity\r\n'
+                f'Connection: close\r\n\r\n'
+            ).encode('utf-8'))
+            await writer.drain()
+            return await asyncio.wait_for(
+                self._read_http_body(reader), self._timeout[1])
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_http_body(reader: asyncio.StreamReader) -> bytes:
+        """
+        读取 HTTP 响应头，并根据传输方式读取完整的响应体
+        :param reader: 流读取器
+        :return: 响应体
+        """
+        head = await reader.readuntil(b'\r\n\r\n')
+        headers = {}
+        for line in head.decode('latin-1').split('\r\n')[1:]:
+            if ':' in line:
+                k, v = line.split(':', 1)
+                headers[k.strip().lower()] = v.strip()
+
+        # 分块传输编码
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = bytearray()
+            while True:
+                size_line = await reader.readuntil(b'\r\n')
+                size = int(size_line.split(b';')[0].strip(), 16)
+                if size == 0:
+                    break
+                body.extend(await reader.readexactly(size))
+                await reader.readexactly(2)
+            return bytes(body)
+
+        # 指定长度或读取至连接关闭
+        if 'content-length' in headers:
+            return await reader.readexactly(int(headers['content-length']))
+        return await reader.read()
+
     @property
     def _ak_sk(self) -> Tuple[str, str]:
         """
@@ -53,6 +191,14 @@ class UCloudNativeSDK(AbstractNativeSDK):
         """
         return UCLOUD_KEY
 
+    def _build_url(self) -> str:
+        """
+        构造带参数和签名的完整请求地址
+        :return: 请求地址
+        """
+        return self._url + self._build_url_params() + '&Signature=' + \
+            self._get_signature()
+
     def _build_url_params(self) -> str:
         """
         构造请求参数
@@ -110,6 +256,27 @@ class UCloudNativeSDK(AbstractNativeSDK):
             return str(int(v)) if v % 1 == 0 else str(v)
         return str(v)
 
+    def _check_resp(self, resp: dict) -> dict:
+        """
+        检查响应的返回码，非 0 时转为标准的错误响应
+        :param resp: 响应字典
+        :return: 响应字典
+        """
+        if resp.get('RetCode', 0) != 0:
+            return self._build_error_data(resp)
+        return resp
+
+    def _build_timeout_error_data(self) -> dict:
+        """
+        构造请求超时的错误响应
+        :return: 响应字典
+        """
+        resp = {
+            'RetCode': '502',
+            'Message': 'request timeout'
+        }
+        return self._build_error_data(resp)
+
     def _build_error_data(self, resp: dict) -> dict:
         """
         根据错误响应来构造响应
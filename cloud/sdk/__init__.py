@@ -1,3 +1,16 @@
 from .client import *
+from .async_client import *
 from .request import *
 from .response import *
+from .dedup import *
+from .columnar import *
+from .limiter import *
+from .executor import *
+from .cache import *
+from .concurrency import *
+from .retry import *
+from .breaker import *
+from .singleflight import *
+from .checkpoint import *
+from .telemetry import *
+from .registry import *
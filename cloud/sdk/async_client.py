@@ -0,0 +1,152 @@
+from typing import Dict, List, Tuple
+from asgiref.sync import sync_to_async
+from .client import AbstractCloudSDKClient
+from .request import CloudSDKRequest, CloudSDKLowLayerRequest
+from .response import CloudSDKResponse
+from .executor import io_executor
+from .concurrency import concurrency_controller
+from .telemetry import telemetry
+import asyncio
+import time
+
+
+__all__ = ['AsyncCloudSDKClient']
+
+
+class AsyncCloudSDKClient(AbstractCloudSDKClient):
+    """
+    基于 asyncio 的云 SDK 客户端，所有地域和分页的底层请求并发等待
+    只应用令牌桶限流、动作并发数和重试策略，不使用响应缓存、熔断器、相同请求合并、
+    自适应并发控制和分页检查点，动作中的相应配置对异步客户端不生效
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化限制动作并发数的信号量，信号量绑定于事件循环，因此由客户端对象持有
+        """
+        self._semaphore_map: Dict[str, asyncio.Semaphore] = {}
+
+    async def execute(self, request: CloudSDKRequest) -> CloudSDKResponse:
+        """
+        执行请求
+        :param request: 请求对象
+        :return: 响应对象
+        """
+        # 响应对象，配置了联合唯一键时合并时去重
+        full_response = CloudSDKResponse(unique_keys=request.descriptor.unique_keys)
+
+        # 子请求的构建可能访问数据库，需要在线程中进行
+        child_requests = await sync_to_async(request.get_child_requests)()
+
+        # 地域计划为空时没有需要执行的请求
+        if not child_requests:
+            return full_response
+
+        # 游标分页的子请求依次处理，下一页的请求与当前页的清洗同时进行
+        if isinstance(child_requests[0], CloudSDKLowLayerRequest) and request.cursor_paging:
+            results = await self._execute_cursor(request, child_requests[0])
+            full_response.extend(self._merge_results(results, accumulate=True))
+
+        # 子请求是底层请求则并发处理，叠加数据后合并得到完整响应
+        elif isinstance(child_requests[0], CloudSDKLowLayerRequest):
+            # 首个分页同时用于确定分页，其响应作为结果的一部分，不再重复请求
+            result = await self._low_layer_execute(child_requests[0])
+            total = result.get('total')
+            request.redo_paging_request(total)
+            results = await asyncio.gather(
+                *[self._low_layer_execute(r) for r in request[1:]])
+            full_response.extend(self._merge_results([result, *results]), request.region, check_gap=True)
+
+        # 子请求是 SDK 请求则并发递归处理，同时执行的地域数不超过配置，合并所有响应得到完整响应
+        else:
+            region_parallelism = request.csp_conf.get('region_parallelism', 1)
+            sp = asyncio.Semaphore(region_parallelism)
+
+            async def execute_child(child_req: CloudSDKRequest) -> CloudSDKResponse:
+                async with sp:
+                    return await self.execute(child_req)
+
+            responses = await asyncio.gather(
+                *[execute_child(child_req) for child_req in child_requests])
+            for child_req, resp in zip(child_requests, responses):
+                full_response.extend(resp, child_req.region)
+
+        return full_response
+
+    async def _execute_cursor(
+            self,
+            request: CloudSDKRequest,
+            first_request: CloudSDKLowLayerRequest) -> List[dict]:
+        """
+        依次执行游标分页的底层请求，得到原始响应后立即请求下一页，并在线程中清洗当前页
+        :param request: 请求对象
+        :param first_request: 首页请求
+        :return: 各分页的响应结果列表
+        """
+        loop = asyncio.get_running_loop()
+        results = []
+        low_layer_req = first_request
+        fetch = asyncio.ensure_future(self._low_layer_fetch(low_layer_req))
+        while fetch is not None:
+            resp, attempt = await fetch
+            next_req = request.build_cursor_request(low_layer_req, resp)
+            fetch = None
+            if next_req is not None:
+                fetch = asyncio.ensure_future(self._low_layer_fetch(next_req))
+
+            results.append(await loop.run_in_executor(
+                io_executor, self._clean_result, low_layer_req, resp, attempt))
+            low_layer_req = next_req
+        return results
+
+    async def _low_layer_execute(self, request: CloudSDKLowLayerRequest) -> dict:
+        """
+        执行单个底层请求，清洗占用 CPU，在线程中进行，避免阻塞事件循环中的其他请求
+        :param request: 内部请求对象
+        :return: 响应结果
+        """
+        resp, attempt = await self._low_layer_fetch(request)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(io_executor, self._clean_result, request, resp, attempt)
+
+    async def _low_layer_fetch(self, request: CloudSDKLowLayerRequest) -> Tuple[dict, int]:
+        """
+        执行单个底层请求，按重试策略重试，不进行清洗
+        :param request: 内部请求对象
+        :return: 原始响应和得到响应时的尝试次数组成的元组
+        """
+        # 获取原生 sdk 对象
+        csp = request.parent.csp
+        action = request.parent.action
+        native_sdk = self._get_native_sdk(request)
+
+        # 获取限制动作并发数的信号量
+        req_limit = request.parent.csp_conf['req_limit']
+        key = f'{csp}:{action}'
+        if not self._semaphore_map.get(key):
+            self._semaphore_map[key] = asyncio.Semaphore(req_limit)
+        sp = self._semaphore_map.get(key)
+
+        # 请求重试机制，每次请求前从共享的令牌桶获取令牌，控制请求频率
+        # 按重试策略退避，退避期间不占用线程
+        descriptor = request.parent.descriptor
+        policy = descriptor.retry_policy
+        metrics = telemetry.get_metrics(csp, action, request.region)
+        attempt = 1
+        while True:
+            started = time.monotonic()
+            await descriptor.bucket.async_acquire()
+            async with sp:
+                requested = time.monotonic()
+                resp = await native_sdk.async_request()
+                metrics.record_call(time.monotonic() - requested, requested - started,
+                                    resp is None or 'Error' in resp,
+                                    concurrency_controller.is_throttled(csp, resp))
+
+            if not policy.should_retry(attempt, resp):
+                break
+            metrics.record_retry()
+            await asyncio.sleep(policy.get_delay(attempt))
+            attempt += 1
+
+        return resp, attempt
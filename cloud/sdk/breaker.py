@@ -0,0 +1,237 @@
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
+from threading import Lock
+from ..configs import cloud_config
+import time
+
+
+__all__ = ['CircuitBreaker', 'CircuitBreakerRegistry', 'circuit_breakers']
+
+
+class CircuitBreaker:
+    """
+    熔断器，最近请求的失败比例达到阈值时打开，打开期间快速失败
+    打开一段时间后进入半开状态，放行少量探测请求，探测成功则关闭，失败则重新打开
+    与地域可用性无关的结果不计入统计，如参数错误等调用方的错误
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self,
+                 failure_ratio: float = 0.5,
+                 window: int = 20,
+                 min_calls: int = 10,
+                 open_seconds: float = 30,
+                 half_open_probes: int = 1) -> None:
+        """
+        初始化
+        :param failure_ratio: 打开熔断的失败比例
+        :param window: 统计失败比例的最近请求数
+        :param min_calls: 统计失败比例所需的最少请求数
+        :param open_seconds: 打开后进入半开状态前的时间，单位秒
+        :param half_open_probes: 半开状态下放行的探测请求数，全部成功后关闭
+        """
+        self._failure_ratio = failure_ratio
+        self._min_calls = min_calls
+        self._open_seconds = open_seconds
+        self._half_open_probes = half_open_probes
+
+        self._state = self.CLOSED
+        self._calls: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = 0
+        self._probe_successes = 0
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        获取熔断器状态，打开时间已满的熔断器视为半开
+        """
+        with self._lock:
+            if self._state == self.OPEN and self._open_elapsed():
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """
+        是否处于打开状态，不消耗半开状态的探测机会
+        :return: 是否打开
+        """
+        return self.state == self.OPEN
+
+    def allow(self) -> bool:
+        """
+        判断是否允许请求，半开状态下只放行有限的探测请求
+        :return: 是否允许
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                if not self._open_elapsed():
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = 0
+                self._probe_successes = 0
+
+            if self._state == self.HALF_OPEN:
+                if self._probing >= self._half_open_probes:
+                    return False
+                self._probing += 1
+
+            return True
+
+    def record(self, success: Optional[bool]) -> None:
+        """
+        记录请求结果
+        :param success: 是否成功，为 None 时不计入统计，只归还半开状态的探测机会
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = max(self._probing - 1, 0)
+                if success is None:
+                    return
+                if not success:
+                    self._open()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self._half_open_probes:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                return
+
+            if self._state == self.OPEN or success is None:
+                return
+
+            self._calls.append(success)
+            if len(self._calls) >= self._min_calls:
+                failures = self._calls.count(False)
+                if failures / len(self._calls) >= self._failure_ratio:
+                    self._open()
+
+    def stats(self) -> dict:
+        """
+        获取熔断器状态
+        :return: 状态字典
+        """
+        state = self.state
+        with self._lock:
+            calls = len(self._calls)
+            failures = self._calls.count(False)
+            retry_after = 0.0
+            if state == self.OPEN:
+                retry_after = self._open_seconds - (time.monotonic() - self._opened_at)
+        return {
+            'state': state,
+            'calls': calls,
+            'failures': failures,
+            'retry_after': round(max(retry_after, 0), 3)
+        }
+
+    def _open(self) -> None:
+        """
+        打开熔断器，需在持有锁时调用
+        """
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = 0
+        self._probe_successes = 0
+
+    def _open_elapsed(self) -> bool:
+        """
+        打开时间是否已满，需在持有锁时调用
+        :return: 是否已满
+        """
+        return time.monotonic() - self._opened_at >= self._open_seconds
+
+
+class CircuitBreakerRegistry:
+    """
+    进程内共享的熔断器集合，按 (供应商, 地域, 动作) 分别维护熔断器
+    配置来自 yaml 的 settings.circuit_breaker，其中 failure_codes 为计为失败的错误码
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化熔断器存储字典
+        """
+        self._breakers: Dict[Tuple[str, str, str], CircuitBreaker] = {}
+        self._lock = Lock()
+
+    def get_breaker(self, csp: str, region: Optional[str], action: str) -> CircuitBreaker:
+        """
+        获取熔断器，不存在则根据配置创建
+        :param csp: 云供应商标识
+        :param region: 地域
+        :param action: 动作标识
+        :return: 熔断器
+        """
+        key = (csp, region or '', action)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    conf = cloud_config[csp]['settings'].get('circuit_breaker') or {}
+                    breaker = CircuitBreaker(**{k: v for k, v in conf.items() if k != 'failure_codes'})
+                    self._breakers[key] = breaker
+        return breaker
+
+    @staticmethod
+    def get_outcome(csp: str, resp: Optional[dict], throttled: bool = False) -> Optional[bool]:
+        """
+        判断请求结果对熔断器而言是否成功
+        未得到响应的传输错误，以及错误码在 failure_codes 中的超时和服务端错误计为失败
+        限流说明地域可用，计为成功，其余错误如参数、鉴权和资源不存在由调用方引起，不计入统计
+        :param csp: 云供应商标识
+        :param resp: 原生 sdk 响应
+        :param throttled: 是否被供应商限流
+        :return: 是否成功，不计入统计时返回 None
+        """
+        if resp is None:
+            return False
+        if 'Error' not in resp or throttled:
+            return True
+        conf = cloud_config[csp]['settings'].get('circuit_breaker') or {}
+        if str(resp['Error'].get('code')) in (conf.get('failure_codes') or []):
+            return False
+        return None
+
+    def is_open(self, csp: str, region: Optional[str], action: str) -> bool:
+        """
+        判断熔断器是否打开，不存在的熔断器视为关闭
+        :param csp: 云供应商标识
+        :param region: 地域
+        :param action: 动作标识
+        :return: 是否打开
+        """
+        breaker = self._breakers.get((csp, region or '', action))
+        return bool(breaker and breaker.is_open())
+
+    def get_open_regions(self, csp: str, action: Optional[str] = None) -> List[str]:
+        """
+        获取熔断器打开的地域
+        :param csp: 云供应商标识
+        :param action: 动作标识，为空时包括所有动作
+        :return: 地域列表
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return sorted({
+            region for (c, region, a), breaker in breakers.items()
+            if c == csp and (action is None or a == action) and breaker.is_open()
+        })
+
+    def stats(self) -> dict:
+        """
+        获取所有熔断器的状态
+        :return: 以 供应商:地域:动作 为键的状态字典
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {':'.join(k): v.stats() for k, v in breakers.items()}
+
+
+# 外部使用的实例，进程内所有客户端共享
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,214 @@
+from typing import Callable, Optional, Tuple
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock, Thread
+from django.core.cache import caches
+from .request import CloudSDKRequest
+from .response import CloudSDKResponse
+from utils import logger
+import time
+
+
+__all__ = ['ResponseCache', 'response_cache']
+
+
+class ResponseCache:
+    """
+    只读查询动作的响应缓存，以 (供应商, 动作, 规范化参数) 为键
+    包含进程内的 LRU 缓存，以及可选的基于 redis 的共享缓存
+    过期后的一段时间内仍返回旧值，同时在后台刷新
+    因熔断跳过地域或存在缺失记录的不完整响应不写入缓存
+    """
+
+    # 共享缓存的键前缀
+    key_prefix = 'cloud_sdk:response'
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        初始化
+        :param max_size: 进程内缓存的最大条目数
+        """
+        self._max_size = max_size
+        self._local: OrderedDict = OrderedDict()
+        self._refreshing = set()
+        self._lock = Lock()
+
+    @staticmethod
+    def get_conf(request: CloudSDKRequest) -> Optional[dict]:
+        """
+        获取请求的缓存配置，只有查询类型的动作允许缓存
+        :param request: 请求对象
+        :return: 缓存配置，不允许缓存时返回 None
+        """
+        conf = request.action_conf.get('cache')
+        if not conf or not conf.get('ttl') or not request.action.startswith('query_'):
+            return None
+        return conf
+
+    def get_or_fetch(
+            self,
+            request: CloudSDKRequest,
+            fetch: Callable[[CloudSDKRequest], CloudSDKResponse]) -> CloudSDKResponse:
+        """
+        获取缓存的响应，缓存不存在或已失效时执行请求并写入缓存
+        处于过期宽限期内时直接返回旧值，并在后台刷新
+        :param request: 请求对象
+        :param fetch: 执行请求的函数，参数为请求对象
+        :return: 响应对象
+        """
+        conf = self.get_conf(request)
+        if not conf:
+            return fetch(request)
+
+        key = f'{self.key_prefix}:{request.get_fingerprint()}'
+        ttl = conf['ttl']
+        stale_ttl = conf.get('stale_ttl') or 0
+        shared = conf.get('shared', False)
+
+        entry = self._get(key, shared)
+        if entry:
+            stored_at, payload = entry
+            age = time.time() - stored_at
+            if age < ttl:
+                return self._build_response(payload)
+            if age < ttl + stale_ttl:
+                self._refresh_in_background(key, request, fetch, ttl + stale_ttl, shared)
+                return self._build_response(payload)
+
+        resp = fetch(request)
+        self._store(key, resp, ttl + stale_ttl, shared)
+        return resp
+
+    def invalidate(self, request: CloudSDKRequest) -> None:
+        """
+        删除请求对应的缓存
+        :param request: 请求对象
+        """
+        key = f'{self.key_prefix}:{request.get_fingerprint()}'
+        with self._lock:
+            self._local.pop(key, None)
+        try:
+            caches['default'].delete(key)
+        except Exception as e:
+            logger.warning(f'shared response cache delete failed: {e}')
+
+    def clear(self) -> None:
+        """
+        清空进程内缓存
+        """
+        with self._lock:
+            self._local.clear()
+
+    def _get(self, key: str, shared: bool) -> Optional[Tuple[float, dict]]:
+        """
+        依次从进程内缓存和共享缓存中获取条目，共享缓存命中时回填进程内缓存
+        :param key: 缓存键
+        :param shared: 是否使用共享缓存
+        :return: 写入时间和响应字典组成的元组
+        """
+        with self._lock:
+            entry = self._local.get(key)
+            if entry:
+                self._local.move_to_end(key)
+                return entry
+
+        if shared:
+            try:
+                entry = caches['default'].get(key)
+            except Exception as e:
+                logger.warning(f'shared response cache get failed: {e}')
+                entry = None
+            if entry:
+                self._set_local(key, tuple(entry))
+                return tuple(entry)
+
+        return None
+
+    def _store(self, key: str, resp: CloudSDKResponse, timeout: float, shared: bool) -> None:
+        """
+        写入完整的响应，因熔断跳过地域或存在缺失记录的响应不写入
+        :param key: 缓存键
+        :param resp: 响应对象
+        :param timeout: 条目的最长保留时间，单位秒
+        :param shared: 是否使用共享缓存
+        """
+        if resp.skipped_regions or resp.gaps:
+            logger.info(f'skip caching partial response {key}: '
+                        f'skipped regions {resp.skipped_regions}, gaps {resp.gaps}')
+            return
+        self._set(key, resp.to_dict(compact=True), timeout, shared)
+
+    def _set(self, key: str, payload: dict, timeout: float, shared: bool) -> None:
+        """
+        写入进程内缓存，并按需写入共享缓存
+        :param key: 缓存键
+        :param payload: 响应字典
+        :param timeout: 条目的最长保留时间，单位秒
+        :param shared: 是否使用共享缓存
+        """
+        entry = (time.time(), deepcopy(payload))
+        self._set_local(key, entry)
+
+        if shared:
+            try:
+                caches['default'].set(key, entry, timeout)
+            except Exception as e:
+                logger.warning(f'shared response cache set failed: {e}')
+
+    def _set_local(self, key: str, entry: Tuple[float, dict]) -> None:
+        """
+        写入进程内缓存，超出最大条目数时淘汰最久未使用的条目
+        :param key: 缓存键
+        :param entry: 写入时间和响应字典组成的元组
+        """
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_size:
+                self._local.popitem(last=False)
+
+    def _refresh_in_background(
+            self,
+            key: str,
+            request: CloudSDKRequest,
+            fetch: Callable[[CloudSDKRequest], CloudSDKResponse],
+            timeout: float,
+            shared: bool) -> None:
+        """
+        在后台线程中执行请求并刷新缓存，同一个键同时只有一个刷新任务
+        请求本身会占用共享执行器，因此刷新任务不放入共享执行器，避免互相等待
+        刷新使用新构建的请求，避免与调用方的请求共享子请求和跳过的地域等执行状态
+        :param key: 缓存键
+        :param request: 请求对象
+        :param fetch: 执行请求的函数，参数为请求对象
+        :param timeout: 条目的最长保留时间，单位秒
+        :param shared: 是否使用共享缓存
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh() -> None:
+            try:
+                self._store(key, fetch(request.clone()), timeout, shared)
+            except Exception as e:
+                logger.warning(f'response cache refresh failed: {e}')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        Thread(target=refresh, daemon=True).start()
+
+    @staticmethod
+    def _build_response(payload: dict) -> CloudSDKResponse:
+        """
+        根据缓存的响应字典构建响应对象，数据进行复制，避免调用方修改缓存
+        :param payload: 响应字典
+        :return: 响应对象
+        """
+        return CloudSDKResponse(deepcopy(payload['data']), payload['total'], schema=payload.get('schema'))
+
+
+# 外部使用的实例，进程内所有客户端共享
+response_cache = ResponseCache()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Optional
+from django.conf import settings
+from utils import logger
+from .columnar import ColumnarRecords
+import json
+import os
+import shutil
+import time
+
+if TYPE_CHECKING:
+    from .request import CloudSDKRequest
+
+
+__all__ = ['PageCheckpoint', 'CheckpointStore', 'checkpoint_store']
+
+
+class PageCheckpoint:
+    """
+    底层请求集合的分页检查点，已完成分页的结果按页序保存为目录下的文件
+    首个分页决定了分页方式，因此只有首个分页存在且未过期时，检查点才可复用
+    """
+
+    def __init__(self, directory: str, stale_seconds: float) -> None:
+        """
+        初始化
+        :param directory: 保存分页的目录
+        :param stale_seconds: 有效期，单位秒
+        """
+        self._directory = directory
+        self._stale_seconds = stale_seconds
+
+    def load(self) -> Dict[int, dict]:
+        """
+        加载已完成的分页，空的或损坏的分页文件视为缺失的分页，首个分页缺失或过期时清除检查点
+        :return: 页序和分页结果组成的字典
+        """
+        probe_file = self._get_page_file(0)
+        if not os.path.exists(probe_file):
+            self.clear()
+            return {}
+
+        if time.time() - os.path.getmtime(probe_file) > self._stale_seconds:
+            self.clear()
+            return {}
+
+        pages = {}
+        for name in os.listdir(self._directory):
+            index, ext = os.path.splitext(name)
+            if ext != '.json' or not index.isdigit():
+                continue
+            try:
+                with open(os.path.join(self._directory, name)) as f:
+                    result = json.loads(f.read())
+            except (OSError, ValueError):
+                continue
+            if isinstance(result, dict):
+                pages[int(index)] = result
+
+        if 0 not in pages:
+            self.clear()
+            return {}
+        return pages
+
+    def save(self, index: int, result: dict) -> None:
+        """
+        保存分页结果，先写入临时文件再替换，避免中断时留下不完整的文件
+        列式记录保存为紧凑记录，结果无法序列化时不保存该分页，重跑时重新请求
+        :param index: 页序
+        :param result: 分页结果
+        """
+        if isinstance(result.get('data'), ColumnarRecords):
+            result = dict(result, data=result['data'].to_rows())
+        try:
+            content = json.dumps(result)
+        except (TypeError, ValueError) as e:
+            logger.warning(f'skip checkpoint of page {index}, result is not serializable: {e}')
+            return
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            page_file = self._get_page_file(index)
+            tmp_file = f'{page_file}.tmp'
+            with open(tmp_file, 'w') as f:
+                f.write(content)
+            os.replace(tmp_file, page_file)
+        except OSError as e:
+            logger.warning(f'save checkpoint failed: {e}')
+
+    def clear(self) -> None:
+        """
+        清除检查点
+        """
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _get_page_file(self, index: int) -> str:
+        """
+        获取分页文件路径
+        :param index: 页序
+        :return: 文件路径
+        """
+        return os.path.join(self._directory, f'{index}.json')
+
+
+class CheckpointStore:
+    """
+    检查点存储，以请求指纹作为检查点目录名，目录和有效期通过 settings.CLOUD_SDK_CHECKPOINT 配置
+    """
+
+    @property
+    def directory(self) -> str:
+        """
+        获取检查点根目录
+        """
+        conf = getattr(settings, 'CLOUD_SDK_CHECKPOINT', {})
+        return conf.get('directory') or os.path.join(settings.BASE_DIR, 'sdk-checkpoints/')
+
+    @property
+    def stale_seconds(self) -> float:
+        """
+        获取检查点的有效期
+        """
+        conf = getattr(settings, 'CLOUD_SDK_CHECKPOINT', {})
+        return conf.get('stale_seconds', 3600)
+
+    def get_checkpoint(self, request: CloudSDKRequest) -> Optional[PageCheckpoint]:
+        """
+        获取底层请求集合的检查点，未开启检查点或为游标分页时返回 None
+        :param request: 子请求为底层请求的请求对象
+        :return: 检查点对象
+        """
+        if not request.checkpoint or request.cursor_paging:
+            return None
+        directory = os.path.join(self.directory, request.get_fingerprint())
+        return PageCheckpoint(directory, self.stale_seconds)
+
+
+# 外部使用的实例，进程内所有客户端共享
+checkpoint_store = CheckpointStore()
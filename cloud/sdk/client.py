@@ -1,135 +1,706 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional, Iterable, Iterator, Dict, Tuple, List, Deque, Set
+from abc import ABC, abstractmethod
 from .request import CloudSDKRequest, CloudSDKLowLayerRequest
 from .response import CloudSDKResponse
-from concurrent.futures import ThreadPoolExecutor
-from threading import BoundedSemaphore
-from ..exceptions import CloudSDKClientError
-from utils import datetime_to_timestamp, dynamic_import_class
+from .columnar import ColumnarRecords
+from .executor import io_executor
+from .cache import response_cache
+from .concurrency import concurrency_controller, AdaptiveConcurrencyLimit
+from .breaker import circuit_breakers
+from .singleflight import single_flight
+from .checkpoint import checkpoint_store, PageCheckpoint
+from .telemetry import telemetry
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+import heapq
+import itertools
 import time
-import os
+from collections import deque
+from ..exceptions import CloudSDKClientError
+from utils import logger
 
+if TYPE_CHECKING:
+    from ..native_sdk import AbstractNativeSDK
 
-__all__ = ['CloudSDKClient']
 
+__all__ = ['AbstractCloudSDKClient', 'CloudSDKClient']
 
-# 限制动作的信号量
-semaphore_map = {}
 
+class AbstractCloudSDKClient(ABC):
+    """
+    抽象的云 SDK 客户端，提供同步和异步客户端共用的方法
+    """
 
-class CloudSDKClient:
+    @abstractmethod
+    def execute(self, request: CloudSDKRequest):
+        """
+        执行请求
+        :param request: 请求对象
+        :return: 响应对象，异步客户端返回可等待对象
+        """
+        pass
+
+    @staticmethod
+    def _get_native_sdk(request: CloudSDKLowLayerRequest) -> AbstractNativeSDK:
+        """
+        获取原生 sdk 对象，并设置请求信息，原生 sdk 类和初始化参数来自编译后的动作描述
+        :param request: 底层请求对象
+        :return: 原生 sdk 对象
+        """
+        return request.parent.descriptor.create_native_sdk(request.params)
+
+    @staticmethod
+    def _clean(request: CloudSDKLowLayerRequest, resp: dict) -> dict:
+        """
+        预处理原始数据
+        :param request: 底层请求对象
+        :param resp: 原始响应
+        :return: 清洗后的数据
+        """
+        cleaner = request.parent.descriptor.create_cleaner(request)
+        return cleaner.clean(resp)
+
+    def _clean_result(self, request: CloudSDKLowLayerRequest, resp: dict, attempt: int = 1) -> dict:
+        """
+        预处理原始数据，并记录重试次数，以及清洗耗时和分页的记录数
+        :param request: 底层请求对象
+        :param resp: 原始响应
+        :param attempt: 得到响应时是第几次尝试
+        :return: 清洗后的数据
+        """
+        started = time.monotonic()
+        result = self._clean(request, resp)
+        if isinstance(result, dict):
+            result['retries'] = attempt - 1
+            if isinstance(result.get('data'), (list, ColumnarRecords)):
+                metrics = telemetry.get_metrics(
+                    request.parent.csp, request.parent.action, request.region)
+                metrics.record_clean(time.monotonic() - started, len(result['data']))
+        return result
+
+    @staticmethod
+    def _build_page(result: dict, full_error: list) -> Optional[CloudSDKResponse]:
+        """
+        将单个底层请求的结果构造为分页响应，错误结果加入错误列表，没有记录的分页不视为错误
+        :param result: 底层请求结果
+        :param full_error: 错误列表
+        :return: 分页响应，错误时返回 None
+        """
+        try:
+            data = result.get('data')
+            if isinstance(data, (list, ColumnarRecords)):
+                return CloudSDKResponse(data, result['total'], result.get('retries', 0), schema=result.get('schema'))
+            full_error.append(result)
+        except Exception as e:
+            full_error.append(e.args)
+        return None
+
+    def _merge_results(self, results: Iterable[dict], accumulate: bool = False) -> CloudSDKResponse:
+        """
+        叠加底层请求的结果，存在错误时抛出异常
+        :param results: 底层请求结果列表
+        :param accumulate: 是否累加各分页的总数，用于总数未知的游标分页
+        :return: 响应结果
+        """
+        resp = CloudSDKResponse()
+        full_error = []
+        for result in results:
+            # 叠加数据，更新总数
+            page = self._build_page(result, full_error)
+            if page and accumulate:
+                resp.extend(page)
+            elif page:
+                resp.add(page)
+
+        if full_error:
+            raise CloudSDKClientError(full_error)
+
+        return resp
+
+
+class CloudSDKClient(AbstractCloudSDKClient):
     """
     云 SDK 客户端
     """
 
     def __init__(self) -> None:
         """
-        初始化执行器
+        初始化执行器，使用进程内共享的 I/O 执行器
         """
-        core = os.cpu_count()
-        self._executor = ThreadPoolExecutor(core)
+        self._executor = io_executor
+
+    # 存在未获得并发名额的分页时，检查其他请求是否已归还名额的间隔，单位秒
+    admission_poll_interval = 0.05
 
     def execute(self, request: CloudSDKRequest) -> CloudSDKResponse:
         """
-        执行请求
+        执行请求，配置了缓存的查询动作优先使用缓存的响应
         :param request: 请求对象
         :return: 响应对象
         """
-        # 响应对象
-        full_response = CloudSDKResponse()
+        return response_cache.get_or_fetch(request, self._execute)
 
-        # 根据子请求类型进行处理
-        # 子请求是底层请求则并行处理，叠加数据后合并得到完整响应
-        if isinstance(request[0], CloudSDKLowLayerRequest):
-            # 根据第一个响应确定分页，并执行构建分页请求
-            result = self._low_layer_execute(request[0])
-            total = result.get('total')
-            request.redo_paging_request(total)
-            full_response.extend(self._concurrent_execute(request))
+    def _execute(self, request: CloudSDKRequest) -> CloudSDKResponse:
+        """
+        向供应商执行请求，合并所有分页得到完整响应
+        :param request: 请求对象
+        :return: 响应对象
+        """
+        # 同一底层请求集合的分页按页序叠加，不同集合的响应进行合并
+        leaf_pages: Dict[CloudSDKRequest, Dict[int, CloudSDKResponse]] = {}
+        for leaf, index, page in self._iter_pages(request):
+            leaf_pages.setdefault(leaf, {})[index] = page
 
-        # 子请求是 SDK 请求则递归处理，合并所有响应得到完整响应
-        else:
-            for child_req in request:
-                full_response.extend(self.execute(child_req))
+        # 配置了联合唯一键时，跨分页和地域丢弃重复的记录，总数可信的集合检查缺失的记录
+        full_response = CloudSDKResponse(unique_keys=request.descriptor.unique_keys)
+        for leaf, pages in leaf_pages.items():
+            # 游标分页的总数未知，累加各分页的总数
+            leaf_response = CloudSDKResponse()
+            for index in sorted(pages):
+                if leaf.cursor_paging:
+                    leaf_response.extend(pages[index])
+                else:
+                    leaf_response.add(pages[index])
+            full_response.extend(leaf_response, leaf.region, check_gap=not leaf.cursor_paging)
 
+        full_response.skipped_regions.extend(request.skipped_regions)
+        report = full_response.dedup_report()
+        if report:
+            logger.warning(f'{request.csp}:{request.action} merged with duplicates or gaps: {report}')
         return full_response
 
-    def _concurrent_execute(
+    def execute_iter(self, request: CloudSDKRequest) -> Iterator[CloudSDKResponse]:
+        """
+        执行请求，按完成顺序逐个返回清洗后的分页响应
+        所有分页返回后，若存在错误则抛出异常
+        :param request: 请求对象
+        :return: 分页响应的迭代器
+        """
+        for _, _, page in self._iter_pages(request):
+            yield page
+
+    def _iter_pages(
             self,
-            request: CloudSDKRequest) -> CloudSDKResponse:
+            request: CloudSDKRequest) -> Iterator[Tuple[CloudSDKRequest, int, CloudSDKResponse]]:
         """
-        为所有底层进行多线程执行和汇总
+        并发执行所有底层请求集合，按完成顺序返回分页
+        同时执行的集合数即地域并行数不超过配置，在途的分页总数不超过动作配置的上限
+        分页提交前由调度器获取自适应并发名额和令牌，名额不足的分页等待名额归还，令牌不足的分页进入延迟队列，均不占用执行器线程
+        游标分页的原始响应返回后立即提交下一页，当前页的清洗与下一页的请求同时进行
+        多地域查询时跳过熔断器打开的地域，并记录在请求的 skipped_regions 中
+        开启检查点时保存已完成的分页，存在有效的检查点时只请求缺失的分页，全部成功后清除检查点
         :param request: 请求对象
-        :return: 响应结果
+        :return: 所属请求、页序和分页响应组成的元组迭代器
         """
-        # 根据第一个响应确定分页
-        resp = CloudSDKResponse()
         full_error = []
-        results = self._executor.map(self._low_layer_execute, iter(request))
-        for result in results:
-            try:
-                data = result.get('data')
-                # 叠加数据，更新总数
-                if data:
-                    resp.add(CloudSDKResponse(data, result['total']))
+        request.skipped_regions = []
+        region_parallelism = request.csp_conf.get('region_parallelism', 1)
+        leaf_requests = self._iter_leaf_requests(request)
+        active: List[_LeafExecution] = []
+        futures: Dict[Future, Tuple[_LeafExecution, int, CloudSDKLowLayerRequest, int, _Admission]] = {}
+        # 游标分页中清洗分页的任务
+        cleaning: Dict[Future, Tuple[_LeafExecution, int]] = {}
+        # 延迟队列，退避重试和等待令牌的分页不占用执行器线程，等待令牌的分页已获得并发名额
+        delay_queue: List[Tuple[float, int, _LeafExecution, int, CloudSDKLowLayerRequest, int, Optional[_Admission]]] = []
+        # 未获得并发名额的分页，及其开始等待的时间
+        blocked: Deque[Tuple[_LeafExecution, int, CloudSDKLowLayerRequest, int, float]] = deque()
+        sequence = itertools.count()
+        max_in_flight = request.descriptor.max_in_flight
+        # 由检查点恢复的分页，以及所有集合的检查点
+        restored: List[Tuple[_LeafExecution, List[Tuple[int, dict]]]] = []
+        checkpoints: List[PageCheckpoint] = []
+
+        def dispatch(leaf: _LeafExecution,
+                     index: int,
+                     low_layer_req: CloudSDKLowLayerRequest,
+                     attempt: int,
+                     admission: _Admission) -> None:
+            fn = self._low_layer_fetch if leaf.cursor else self._low_layer_execute
+            futures[self._executor.submit(
+                fn, low_layer_req, admission, attempt)] = (leaf, index, low_layer_req, attempt, admission)
+
+        def admit(leaf: _LeafExecution,
+                  index: int,
+                  low_layer_req: CloudSDKLowLayerRequest,
+                  attempt: int,
+                  queued: float) -> bool:
+            # 获得并发名额后，令牌充足时立即提交，否则进入延迟队列等待令牌补足
+            admission = self._admit(low_layer_req, queued)
+            if admission is None:
+                return False
+            if admission.delay:
+                heapq.heappush(delay_queue, (
+                    time.monotonic() + admission.delay, next(sequence),
+                    leaf, index, low_layer_req, attempt, admission))
+            else:
+                dispatch(leaf, index, low_layer_req, attempt, admission)
+            return True
+
+        def submit(leaf: _LeafExecution,
+                   index: int,
+                   low_layer_req: CloudSDKLowLayerRequest,
+                   attempt: int = 1) -> None:
+            if attempt == 1:
+                leaf.outstanding += 1
+            queued = time.monotonic()
+            if not admit(leaf, index, low_layer_req, attempt, queued):
+                blocked.append((leaf, index, low_layer_req, attempt, queued))
+
+        def start_leaves() -> None:
+            # 首个分页同时用于确定分页，开启推测时根据统计的记录数并行预取后续分页
+            while len(active) < region_parallelism:
+                leaf_req = next(leaf_requests, None)
+                if leaf_req is None:
+                    return
+                if leaf_req is not request and circuit_breakers.is_open(
+                        leaf_req.csp, leaf_req.region, leaf_req.action):
+                    request.skipped_regions.append(leaf_req.region)
+                    continue
+                if leaf_req.cursor_paging:
+                    leaf = _CursorLeafExecution(leaf_req)
+                else:
+                    leaf = _LeafExecution(leaf_req)
+                active.append(leaf)
+
+                # 存在有效的检查点时，由保存的首个分页确定分页，只提交缺失的分页
+                leaf.checkpoint = checkpoint_store.get_checkpoint(leaf_req)
+                if leaf.checkpoint:
+                    checkpoints.append(leaf.checkpoint)
+                    saved = leaf.checkpoint.load()
+                    if 0 in saved:
+                        restored.append((leaf, leaf.restore(saved)))
+                        continue
+
+                submit(leaf, 0, leaf_req[0])
+
+                # 已根据记录数分页时直接提交后续分页，开启推测时根据统计的记录数预估
+                if leaf_req.presized:
+                    speculative_requests = leaf_req[1:]
+                elif leaf_req.speculative:
+                    speculative_requests = leaf_req.build_speculative_requests()
+                else:
+                    speculative_requests = []
+                for r in speculative_requests[:max_in_flight - 1]:
+                    leaf.speculated += 1
+                    submit(leaf, leaf.speculated, r)
+
+        def emit(leaf: _LeafExecution, ready: List[Tuple[int, dict]]) -> Iterator[
+                Tuple[CloudSDKRequest, int, CloudSDKResponse]]:
+            # 输出可以输出的分页，新完成的分页保存到检查点
+            for page_index, page_result in ready:
+                page = self._build_page(page_result, full_error)
+                if page:
+                    if leaf.checkpoint and page_index not in leaf.restored:
+                        leaf.checkpoint.save(page_index, {**page_result, 'retries': 0})
+                    yield leaf.request, page_index, page
+
+            if leaf.finished:
+                active.remove(leaf)
+
+        def start() -> Iterator[Tuple[CloudSDKRequest, int, CloudSDKResponse]]:
+            # 由检查点完全恢复的集合直接完成，继续启动后续集合
+            while True:
+                start_leaves()
+                if not restored:
+                    return
+                while restored:
+                    yield from emit(*restored.pop(0))
+
+        def in_flight() -> int:
+            # 等待名额、令牌和退避中的分页同样计入在途数
+            return len(futures) + len(delay_queue) + len(blocked)
+
+        def submit_pending() -> None:
+            # 先重新尝试未获得并发名额的分页，再提交令牌补足和退避到期的分页，
+            # 最后轮流从各集合提交待请求的分页，直到在途数达到上限
+            for _ in range(len(blocked)):
+                entry = blocked.popleft()
+                if not admit(*entry):
+                    blocked.append(entry)
+
+            now = time.monotonic()
+            while delay_queue and delay_queue[0][0] <= now:
+                _, _, leaf, index, low_layer_req, attempt, admission = heapq.heappop(delay_queue)
+                if admission is not None:
+                    dispatch(leaf, index, low_layer_req, attempt, admission)
+                else:
+                    submit(leaf, index, low_layer_req, attempt)
+
+            progressed = True
+            while progressed and in_flight() < max_in_flight:
+                progressed = False
+                for leaf in active:
+                    if leaf.pending and in_flight() < max_in_flight:
+                        submit(leaf, *leaf.pending.popleft())
+                        progressed = True
+
+        def discard_beyond_end(leaf: _LeafExecution) -> None:
+            # 取消超出末页且尚未开始的预取分页，归还其并发名额
+            for f, (owner, index, _, _, admission) in list(futures.items()):
+                if owner is leaf and index >= leaf.page_number and f.cancel():
+                    del futures[f]
+                    admission.release()
+                    leaf.outstanding -= 1
+
+            for entry in list(blocked):
+                if entry[0] is leaf and entry[1] >= leaf.page_number:
+                    blocked.remove(entry)
+                    leaf.outstanding -= 1
+
+            kept = []
+            for entry in delay_queue:
+                if entry[2] is leaf and entry[3] >= leaf.page_number:
+                    if entry[6]:
+                        entry[6].release()
+                    leaf.outstanding -= 1
+                else:
+                    kept.append(entry)
+            if len(kept) < len(delay_queue):
+                delay_queue[:] = kept
+                heapq.heapify(delay_queue)
+
+        yield from start()
+        submit_pending()
+        while futures or cleaning or delay_queue or blocked:
+            # 没有在途请求时等待至最近的延迟到期，存在未获得名额的分页时定期检查名额
+            timeout = None
+            if delay_queue:
+                timeout = max(0.0, delay_queue[0][0] - time.monotonic())
+            if blocked:
+                timeout = min(timeout, self.admission_poll_interval) if timeout is not None \
+                    else self.admission_poll_interval
+            if futures or cleaning:
+                done, _ = wait([*futures, *cleaning], timeout, FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = set()
+
+            for f in done:
+                if f in cleaning:
+                    leaf, index = cleaning.pop(f)
+                    try:
+                        result = f.result()
+                    except Exception as e:
+                        full_error.append(e.args)
+                        result = None
+
+                elif f in futures:
+                    leaf, index, low_layer_req, attempt, _ = futures.pop(f)
+                    try:
+                        result, retry_delay = f.result()
+                    except Exception as e:
+                        full_error.append(e.args)
+                        result, retry_delay = None, None
+
+                    # 需要重试的分页进入延迟队列，到期后重新获取并发名额和令牌
+                    if retry_delay is not None:
+                        heapq.heappush(delay_queue, (
+                            time.monotonic() + retry_delay, next(sequence),
+                            leaf, index, low_layer_req, attempt + 1, None))
+                        continue
+
+                    # 游标分页先根据原始响应提交下一页，再提交当前页的清洗
+                    if leaf.cursor and result is not None:
+                        next_req = leaf.request.build_cursor_request(low_layer_req, result)
+                        if next_req is not None:
+                            submit(leaf, index + 1, next_req)
+                        cleaning[self._executor.submit(
+                            self._clean_result, low_layer_req, result, attempt)] = (leaf, index)
+                        continue
+
                 else:
-                    full_error.append(result)
-            except Exception as e:
-                full_error.append(e.args)
+                    continue
+                leaf.outstanding -= 1
+
+                # 首个分页返回后确定分页，之前完成的预取分页在此时一并返回
+                ready = leaf.accept(index, result)
+                if index == 0 and not leaf.cursor:
+                    discard_beyond_end(leaf)
+                yield from emit(leaf, ready)
+
+            yield from start()
+            submit_pending()
 
         if full_error:
             raise CloudSDKClientError(full_error)
 
-        return resp
+        for checkpoint in checkpoints:
+            checkpoint.clear()
+
+    def _iter_leaf_requests(self, request: CloudSDKRequest) -> Iterator[CloudSDKRequest]:
+        """
+        递归展开请求，得到子请求为底层请求的请求
+        :param request: 请求对象
+        :return: 请求迭代器
+        """
+        if not len(request):
+            return
+        if isinstance(request[0], CloudSDKLowLayerRequest):
+            yield request
+        else:
+            for child_req in request:
+                yield from self._iter_leaf_requests(child_req)
 
     @staticmethod
-    def _low_layer_execute(request: CloudSDKLowLayerRequest):
+    def _admit(request: CloudSDKLowLayerRequest, queued: float) -> Optional[_Admission]:
         """
-        执行单个底层请求
+        不阻塞地为底层请求获取地域的自适应并发名额，获得名额后从令牌桶预留令牌
         :param request: 内部请求对象
-        :return: 响应结果
+        :param queued: 分页开始等待准入的时间
+        :return: 准入凭证，并发名额不足时返回 None
+        """
+        limit = concurrency_controller.get_limit(request.parent.csp, request.parent.action, request.region)
+        if not limit.try_acquire():
+            return None
+        return _Admission(limit, request.parent.descriptor.bucket.reserve(), queued)
+
+    def _low_layer_execute(
+            self,
+            request: CloudSDKLowLayerRequest,
+            admission: _Admission,
+            attempt: int = 1) -> Tuple[Optional[dict], Optional[float]]:
+        """
+        执行单个底层请求的一次尝试，相同的并发底层请求合并为一次供应商调用，共享清洗后的结果
+        :param request: 内部请求对象
+        :param admission: 调度器获取的准入凭证
+        :param attempt: 当前是第几次尝试
+        :return: 清洗后的响应结果和重试等待时间组成的元组，二者只有一个不为 None
+        """
+        descriptor = request.parent.descriptor
+        if not descriptor.single_flight:
+            return self._low_layer_attempt(request, admission, attempt)
+
+        try:
+            result, retry_delay = single_flight.do(
+                request.get_fingerprint(),
+                lambda: self._low_layer_attempt(request, admission, attempt),
+                descriptor.single_flight_shared)
+        finally:
+            # 合并到其他调用的请求没有发出，归还并发名额且不调整上限
+            admission.release()
+
+        # 共享的结果进行浅复制，避免各调用方叠加数据时互相影响
+        if isinstance(result, dict):
+            result = dict(result)
+            if isinstance(result.get('data'), list):
+                result['data'] = list(result['data'])
+        return result, retry_delay
+
+    def _low_layer_attempt(
+            self,
+            request: CloudSDKLowLayerRequest,
+            admission: _Admission,
+            attempt: int = 1) -> Tuple[Optional[dict], Optional[float]]:
+        """
+        执行单个底层请求的一次尝试，需要重试时不进行清洗，而是返回重试前的等待时间
+        :param request: 内部请求对象
+        :param admission: 调度器获取的准入凭证
+        :param attempt: 当前是第几次尝试
+        :return: 清洗后的响应结果和重试等待时间组成的元组，二者只有一个不为 None
+        """
+        resp, retry_delay = self._low_layer_fetch(request, admission, attempt)
+        if retry_delay is not None:
+            return None, retry_delay
+        return self._clean_result(request, resp, attempt), None
+
+    def _low_layer_fetch(
+            self,
+            request: CloudSDKLowLayerRequest,
+            admission: _Admission,
+            attempt: int = 1) -> Tuple[Optional[dict], Optional[float]]:
+        """
+        执行单个底层请求的一次尝试，不进行清洗，需要重试时返回重试前的等待时间
+        :param request: 内部请求对象
+        :param admission: 调度器获取的准入凭证
+        :param attempt: 当前是第几次尝试
+        :return: 原始响应和重试等待时间组成的元组，二者只有一个不为 None
         """
-        # 获取原生 sdk 对象
         csp = request.parent.csp
         action = request.parent.action
-        sdk_name = request.parent.csp_conf['native_sdk']
-        native_sdk_path = f'cloud.native_sdk.{csp}.{sdk_name}'
-        native_sdk = dynamic_import_class(native_sdk_path)()
-
-        # 设置并请求
-        native_sdk.set(request.parent.interface_conf, request.params)
-        req_limit = request.parent.csp_conf['req_limit']
-        key = f'{csp}:{action}'
-        if not semaphore_map.get(key):
-            semaphore_map[key] = BoundedSemaphore(req_limit)
-        sp = semaphore_map.get(key)
-
-        # 用于计算消耗时间
-        start_time = datetime_to_timestamp()
-        try_time = 3
+
+        # 熔断器打开时快速失败，不再重试
+        breaker = circuit_breakers.get_breaker(csp, request.region, action)
+        if not breaker.allow():
+            admission.release()
+            return {
+                'Error': {
+                    'code': 'CircuitBreakerOpen',
+                    'message': f'circuit breaker of {csp}:{request.region}:{action} is open'
+                }
+            }, None
+
+        # 只有传输错误、超时和服务端错误计为地域的失败，调用方引起的错误不影响熔断
         resp = None
+        try:
+            resp = self._low_layer_request(request, admission)
+        finally:
+            throttled = concurrency_controller.is_throttled(csp, resp)
+            breaker.record(circuit_breakers.get_outcome(csp, resp, throttled))
 
-        # 请求重试机制
-        while try_time:
-            with sp:
-                resp = native_sdk.request()
+        policy = request.parent.descriptor.retry_policy
+        if policy.should_retry(attempt, resp):
+            telemetry.get_metrics(csp, action, request.region).record_retry()
+            return None, policy.get_delay(attempt)
+        return resp, None
 
-            # 得到消耗时间
-            end_time = datetime_to_timestamp()
-            expend_time = end_time - start_time
+    def _low_layer_request(self, request: CloudSDKLowLayerRequest, admission: _Admission) -> dict:
+        """
+        使用原生 sdk 发送单个底层请求
+        令牌和并发名额已由调度器获取，请求结束后根据结果归还名额，准入等待时间和调用耗时记录到遥测中
+        :param request: 内部请求对象
+        :param admission: 调度器获取的准入凭证
+        :return: 原生 sdk 响应
+        """
+        csp = request.parent.csp
+        action = request.parent.action
+        metrics = telemetry.get_metrics(csp, action, request.region)
+        requested = time.monotonic()
+        stream_path = request.parent.descriptor.stream_path
+        resp = None
+        try:
+            native_sdk = self._get_native_sdk(request)
+            resp = native_sdk.stream_request(stream_path) if stream_path else native_sdk.request()
+        finally:
+            throttled = concurrency_controller.is_throttled(csp, resp)
+            failed = resp is None or 'Error' in resp
+            admission.release(throttled, not failed)
+            metrics.record_call(time.monotonic() - requested, requested - admission.queued, failed, throttled)
+        return resp
 
-            # 将请求消耗时间控制在1秒左右，防止请求频率过高
-            if expend_time < 1:
-                time.sleep(1 - expend_time)
 
-            if 'Error' in resp:
-                try_time -= 1
-            else:
-                break
+class _Admission:
+    """
+    底层请求的准入凭证，调度器提交前获取自适应并发名额并预留令牌，请求结束后在执行器线程中归还名额
+    """
+
+    def __init__(self, limit: AdaptiveConcurrencyLimit, delay: float, queued: float) -> None:
+        """
+        初始化
+        :param limit: 已获取名额的自适应并发限制
+        :param delay: 令牌补足前需要等待的秒数
+        :param queued: 分页开始等待准入的时间
+        """
+        self.limit = limit
+        self.delay = delay
+        self.queued = queued
+        self._released = False
+
+    def release(self, throttled: bool = False, succeeded: bool = False) -> None:
+        """
+        归还并发名额，只有首次调用生效，未发出请求时使用默认参数，不调整并发上限
+        :param throttled: 是否被供应商限流
+        :param succeeded: 是否请求成功
+        """
+        if not self._released:
+            self._released = True
+            self.limit.release(throttled, succeeded)
+
+
+class _LeafExecution:
+    """
+    底层请求集合的执行状态，子请求为底层请求的请求对象即为一个集合
+    """
+
+    # 是否为游标分页
+    cursor = False
+
+    def __init__(self, request: CloudSDKRequest) -> None:
+        """
+        初始化
+        :param request: 子请求为底层请求的请求对象
+        """
+        self.request = request
+        self.probed = False
+        self.page_number = 0
+        self.speculated = 0
+        self.outstanding = 0
+        self.pending: Deque[Tuple[int, CloudSDKLowLayerRequest]] = deque()
+        self.checkpoint: Optional[PageCheckpoint] = None
+        self.restored: Set[int] = set()
+        self._parked: Dict[int, Optional[dict]] = {}
+
+    @property
+    def finished(self) -> bool:
+        """
+        是否所有分页均已完成
+        """
+        return self.probed and not self.outstanding and not self.pending
+
+    def accept(self, index: int, result: Optional[dict]) -> List[Tuple[int, dict]]:
+        """
+        接收分页结果，返回可以输出的分页结果
+        首个分页返回前完成的预取分页暂存，首个分页返回后超出末页的分页丢弃
+        :param index: 页序
+        :param result: 分页结果，执行异常时为 None
+        :return: 页序和分页结果组成的元组列表
+        """
+        if index == 0:
+            return self._accept_probe(result)
+
+        if not self.probed:
+            self._parked[index] = result
+            return []
+
+        if result is None or index >= self.page_number:
+            return []
+        return [(index, result)]
+
+    def restore(self, saved: Dict[int, dict]) -> List[Tuple[int, dict]]:
+        """
+        由检查点中保存的分页恢复执行状态，保存的分页不再提交
+        :param saved: 页序和分页结果组成的字典，必须包含首个分页
+        :return: 页序和分页结果组成的元组列表
+        """
+        self._parked.update((i, r) for i, r in saved.items() if i != 0)
+        ready = self._accept_probe(saved[0])
+        self.restored = {i for i, _ in ready}
+        self.pending = deque((i, r) for i, r in self.pending if i not in self.restored)
+        return ready
+
+    def _accept_probe(self, result: Optional[dict]) -> List[Tuple[int, dict]]:
+        """
+        接收首个分页的结果，根据总数重新分页，未被预取覆盖的分页等待提交
+        :param result: 首个分页结果，执行异常时为 None
+        :return: 页序和分页结果组成的元组列表
+        """
+        self.probed = True
+        total = result.get('total') if result else None
+        self.request.redo_paging_request(total)
+        self.page_number = len(self.request)
+
+        remaining = enumerate(self.request[1:], 1)
+        self.pending.extend(
+            (i, r) for i, r in remaining if i > self.speculated)
 
-        # 预处理原始数据
-        cleaner_name = request.parent.csp_conf['cleaner']
-        cleaner_path = f'cloud.cleaner.{csp}.{cleaner_name}'
-        cleaner = dynamic_import_class(cleaner_path)(request)
-        data = cleaner.clean(resp)
+        ready = [(0, result)] if result is not None else []
+        ready.extend(
+            (i, r) for i, r in sorted(self._parked.items())
+            if i < self.page_number and r is not None)
+        self._parked.clear()
+        return ready
 
-        # 返回数据
-        return data
+
+class _CursorLeafExecution(_LeafExecution):
+    """
+    游标分页的底层请求集合的执行状态，下一页请求在上一页的原始响应返回后才能构建
+    """
+
+    cursor = True
+
+    def __init__(self, request: CloudSDKRequest) -> None:
+        """
+        初始化，游标分页不需要根据首个分页确定分页
+        :param request: 子请求为底层请求的请求对象
+        """
+        super().__init__(request)
+        self.probed = True
+
+    def accept(self, index: int, result: Optional[dict]) -> List[Tuple[int, dict]]:
+        """
+        接收分页结果，游标分页按顺序请求，结果直接输出
+        :param index: 页序
+        :param result: 分页结果，执行异常时为 None
+        :return: 页序和分页结果组成的元组列表
+        """
+        self.page_number = max(self.page_number, index + 1)
+        return [(index, result)] if result is not None else []
@@ -0,0 +1,45 @@
+from typing import Any, Iterator, List, Sequence, Tuple
+
+
+__all__ = ['ColumnarRecords']
+
+
+class ColumnarRecords:
+    """
+    按字段保存为列的记录，用于列式清洗的监控数据
+    合并分页时只合并列，调用方访问记录时才按字段顺序组装为元组
+    """
+
+    def __init__(self, schema: Sequence[str], columns: Sequence[Sequence[Any]]) -> None:
+        """
+        初始化
+        :param schema: 字段顺序
+        :param columns: 与字段顺序对应的列，各列长度相同
+        """
+        self.schema: Tuple[str, ...] = tuple(schema)
+        self.columns: List[Sequence[Any]] = list(columns)
+        self._length = len(self.columns[0]) if self.columns else 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[tuple]:
+        """
+        逐条组装按字段顺序排列的元组
+        """
+        return zip(*self.columns)
+
+    def to_rows(self) -> List[tuple]:
+        """
+        组装为元组列表
+        :return: 元组列表
+        """
+        return list(zip(*self.columns))
+
+    def to_records(self) -> List[dict]:
+        """
+        组装为字典列表
+        :return: 字典列表
+        """
+        schema = self.schema
+        return [dict(zip(schema, row)) for row in zip(*self.columns)]
@@ -0,0 +1,180 @@
+from typing import Dict, Optional, Tuple
+from threading import Condition, Lock
+from ..configs import cloud_config
+import time
+
+
+__all__ = ['AdaptiveConcurrencyLimit', 'ConcurrencyController', 'concurrency_controller']
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    基于 AIMD 的自适应并发限制
+    请求成功时加性增加并发上限，被供应商限流时乘性减少并发上限
+    """
+
+    def __init__(self,
+                 initial: float,
+                 min_limit: float = 1,
+                 max_limit: float = 100,
+                 increase: float = 1,
+                 decrease: float = 0.5,
+                 cooldown: float = 1) -> None:
+        """
+        初始化
+        :param initial: 初始并发上限
+        :param min_limit: 最小并发上限
+        :param max_limit: 最大并发上限
+        :param increase: 每轮成功请求增加的并发数
+        :param decrease: 被限流时并发上限的缩减比例
+        :param cooldown: 两次缩减的最小间隔，单位秒，避免同一轮的多个限流重复缩减
+        """
+        self._limit = float(initial)
+        self._min_limit = float(min_limit)
+        self._max_limit = float(max_limit)
+        self._increase = increase
+        self._decrease = decrease
+        self._cooldown = cooldown
+        self._last_decreased = 0.0
+        self._in_flight = 0
+        self._cond = Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        获取当前并发上限
+        """
+        return max(int(self._limit), 1)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        获取当前在途的请求数
+        """
+        return self._in_flight
+
+    def acquire(self) -> None:
+        """
+        阻塞直至在途请求数低于并发上限
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """
+        不阻塞地获取并发名额，供调度器在提交请求前判断是否可以发出
+        :return: 在途请求数低于并发上限时获取成功
+        """
+        with self._cond:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, throttled: bool = False, succeeded: bool = True) -> None:
+        """
+        释放并根据请求结果调整并发上限
+        :param throttled: 是否被供应商限流
+        :param succeeded: 是否请求成功，失败但非限流的请求不调整上限
+        """
+        with self._cond:
+            self._in_flight -= 1
+
+            if throttled:
+                now = time.monotonic()
+                if now - self._last_decreased >= self._cooldown:
+                    self._limit = max(self._min_limit, self._limit * self._decrease)
+                    self._last_decreased = now
+            elif succeeded:
+                # 每个成功请求增加 increase / limit，即每轮约增加 increase
+                self._limit = min(self._max_limit, self._limit + self._increase / self._limit)
+
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """
+        获取并发限制的状态
+        :return: 状态字典
+        """
+        return {
+            'limit': self.limit,
+            'in_flight': self._in_flight
+        }
+
+
+class ConcurrencyController:
+    """
+    进程内共享的自适应并发控制器，按 (供应商, 动作, 地域) 分别维护并发限制
+    配置来自 yaml 的 settings.concurrency，未配置初始值时以 req_limit 作为初始并发上限
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化并发限制存储字典
+        """
+        self._limits: Dict[Tuple[str, str, str], AdaptiveConcurrencyLimit] = {}
+        self._lock = Lock()
+
+    def get_limit(self, csp: str, action: str, region: Optional[str]) -> AdaptiveConcurrencyLimit:
+        """
+        获取并发限制，不存在则根据配置创建
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :param region: 地域
+        :return: 并发限制
+        """
+        key = (csp, action, region or '')
+        limit = self._limits.get(key)
+        if limit is None:
+            with self._lock:
+                limit = self._limits.get(key)
+                if limit is None:
+                    limit = AdaptiveConcurrencyLimit(**self._get_conf(csp))
+                    self._limits[key] = limit
+        return limit
+
+    @staticmethod
+    def is_throttled(csp: str, resp: Optional[dict]) -> bool:
+        """
+        根据错误码判断响应是否为供应商的限流错误
+        :param csp: 云供应商标识
+        :param resp: 原生 sdk 响应
+        :return: 是否被限流
+        """
+        if not resp or 'Error' not in resp:
+            return False
+        conf = cloud_config[csp]['settings'].get('concurrency') or {}
+        throttle_codes = conf.get('throttle_codes') or []
+        return str(resp['Error'].get('code')) in throttle_codes
+
+    def stats(self) -> dict:
+        """
+        获取所有并发限制的状态
+        :return: 以 供应商:动作:地域 为键的状态字典
+        """
+        with self._lock:
+            limits = dict(self._limits)
+        return {':'.join(k): v.stats() for k, v in limits.items()}
+
+    @staticmethod
+    def _get_conf(csp: str) -> dict:
+        """
+        获取并发限制的配置
+        :param csp: 云供应商标识
+        :return: 并发限制初始化参数
+        """
+        csp_conf = cloud_config[csp]['settings']
+        conf = csp_conf.get('concurrency') or {}
+        return {
+            'initial': conf.get('initial', csp_conf.get('req_limit', 1)),
+            'min_limit': conf.get('min', 1),
+            'max_limit': conf.get('max', 100),
+            'increase': conf.get('increase', 1),
+            'decrease': conf.get('decrease', 0.5)
+        }
+
+
+# 外部使用的实例，进程内所有客户端共享
+concurrency_controller = ConcurrencyController()
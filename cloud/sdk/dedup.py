@@ -0,0 +1,84 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+
+__all__ = ['DedupIndex']
+
+
+class DedupIndex:
+    """
+    记录去重索引，以联合唯一键的值为键记录首次出现的来源，用于合并分页和地域时丢弃重复的记录
+    偏移分页并发执行期间资源增减时，相同的记录可能出现在两个分页中
+    """
+
+    def __init__(self, unique_keys: Sequence[str], max_samples: int = 100) -> None:
+        """
+        初始化
+        :param unique_keys: 联合唯一的键
+        :param max_samples: 报告中保留的重复记录样本数
+        """
+        self.unique_keys: Tuple[str, ...] = tuple(unique_keys)
+        self._max_samples = max_samples
+        self._index: Dict[Hashable, Any] = {}
+        self.duplicates = 0
+        self.samples: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def key_of(self, record: Union[dict, Sequence], schema: Optional[Sequence[str]] = None) -> Hashable:
+        """
+        获取记录的联合唯一键值
+        :param record: 记录，为字典或按字段顺序排列的紧凑记录
+        :param schema: 紧凑记录的字段顺序
+        :return: 键值，单个键时为值本身，多个键时为元组
+        """
+        return self._key_getter(schema)(record)
+
+    def _key_getter(self, schema: Optional[Sequence[str]] = None) -> Callable[[Any], Hashable]:
+        """
+        生成获取联合唯一键值的函数，紧凑记录预先计算键的位置
+        :param schema: 紧凑记录的字段顺序
+        :return: 函数
+        """
+        keys = self.unique_keys
+        if schema is None:
+            if len(keys) == 1:
+                return lambda r: r.get(keys[0])
+            return lambda r: tuple(r.get(k) for k in keys)
+
+        positions = [list(schema).index(k) if k in schema else None for k in keys]
+        if len(positions) == 1:
+            i = positions[0]
+            return (lambda r: r[i]) if i is not None else (lambda r: None)
+        return lambda r: tuple(None if i is None else r[i] for i in positions)
+
+    def filter(self, records: list, source: Any = None, schema: Optional[Sequence[str]] = None) -> list:
+        """
+        过滤已出现过的记录，所有记录均首次出现时返回原列表
+        :param records: 记录列表
+        :param source: 记录的来源，如地域，用于报告
+        :param schema: 紧凑记录的字段顺序，记录为字典时为 None
+        :return: 首次出现的记录列表
+        """
+        index = self._index
+        key_of = self._key_getter(schema)
+        kept = None
+        empty = tuple(None for _ in self.unique_keys) if len(self.unique_keys) > 1 else None
+        for i, r in enumerate(records):
+            # 缺少唯一键的记录无法判断是否重复，全部保留
+            key = key_of(r)
+            if key == empty or key not in index:
+                if key != empty:
+                    index[key] = source
+                if kept is not None:
+                    kept.append(r)
+                continue
+
+            # 出现重复时才复制列表
+            if kept is None:
+                kept = records[:i]
+            self.duplicates += 1
+            if len(self.samples) < self._max_samples:
+                self.samples.append({'key': key, 'source': source, 'first_source': index[key]})
+
+        return records if kept is None else kept
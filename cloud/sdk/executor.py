@@ -0,0 +1,115 @@
+from typing import Callable, Optional
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from threading import Lock
+from django.conf import settings
+import atexit
+import os
+
+
+__all__ = ['IOExecutor', 'io_executor']
+
+
+class IOExecutor(Executor):
+    """
+    进程内共享的 I/O 执行器，所有云 SDK 客户端共用同一个线程池
+    线程池在首次提交时创建，进程退出时关闭，线程数通过 settings.CLOUD_SDK_EXECUTOR 配置
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化
+        """
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self._lock = Lock()
+
+    @property
+    def max_workers(self) -> int:
+        """
+        获取最大线程数，网络密集型任务的线程数可远大于 cpu 核数
+        """
+        conf = getattr(settings, 'CLOUD_SDK_EXECUTOR', None) or {}
+        return conf.get('max_workers') or min(64, (os.cpu_count() or 1) * 8)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        提交任务
+        :param fn: 可调用对象
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: 任务的 future 对象
+        """
+        return self._get_executor().submit(self._run, fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        关闭线程池，之后再次提交任务时重新创建
+        :param wait: 是否等待已提交的任务完成
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait)
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        获取等待执行的任务数
+        """
+        executor = self._executor
+        if executor is None:
+            return 0
+        return executor._work_queue.qsize()
+
+    @property
+    def active_workers(self) -> int:
+        """
+        获取正在执行任务的线程数
+        """
+        return self._active
+
+    def stats(self) -> dict:
+        """
+        获取执行器的运行指标
+        :return: 指标字典
+        """
+        return {
+            'max_workers': self.max_workers,
+            'active_workers': self.active_workers,
+            'queue_depth': self.queue_depth
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        获取线程池，不存在则创建
+        :return: 线程池
+        """
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix='cloud-sdk-io')
+                executor = self._executor
+        return executor
+
+    def _run(self, fn: Callable, *args, **kwargs):
+        """
+        执行任务，并统计正在执行任务的线程数
+        :param fn: 可调用对象
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        :return: 任务结果
+        """
+        with self._lock:
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+# 外部使用的实例，进程退出时关闭线程池
+io_executor = IOExecutor()
+atexit.register(io_executor.shutdown, False)
@@ -0,0 +1,166 @@
+from typing import Dict, Tuple
+from threading import Lock
+from ..configs import cloud_config
+from ..exceptions import CloudSDKRequestError
+import asyncio
+import time
+
+
+__all__ = ['TokenBucket', 'RateLimiter', 'rate_limiter']
+
+
+class TokenBucket:
+    """
+    令牌桶，以固定速率补充令牌，允许不超过容量的突发请求
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        初始化
+        :param rate: 每秒补充的令牌数
+        :param burst: 桶容量，即允许的最大突发请求数
+        """
+        self._rate = float(rate)
+        self._burst = max(int(burst), 1)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        获取令牌补充速率
+        """
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        """
+        获取桶容量
+        """
+        return self._burst
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        预留令牌，令牌不足时记为欠额，由调用方等待至令牌补足
+        :param tokens: 令牌数
+        :return: 需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= tokens
+
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self._rate
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        阻塞获取令牌
+        :param tokens: 令牌数
+        :return: 实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def async_acquire(self, tokens: int = 1) -> float:
+        """
+        异步获取令牌
+        :param tokens: 令牌数
+        :return: 实际等待的秒数
+        """
+        wait = self.reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    进程内共享的限流器，按供应商和动作分别维护令牌桶
+    配置来自 yaml 的 settings.rate_limit，未配置时以 req_limit 作为速率和容量
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化令牌桶存储字典
+        """
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = Lock()
+
+    def get_bucket(self, csp: str, action: str) -> TokenBucket:
+        """
+        获取动作对应的令牌桶，不存在则根据配置创建
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 令牌桶
+        """
+        key = (csp, action)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    rate, burst = self._get_conf(csp, action)
+                    bucket = TokenBucket(rate, burst)
+                    self._buckets[key] = bucket
+        return bucket
+
+    def acquire(self, csp: str, action: str) -> float:
+        """
+        阻塞获取动作的一个令牌
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 实际等待的秒数
+        """
+        return self.get_bucket(csp, action).acquire()
+
+    async def async_acquire(self, csp: str, action: str) -> float:
+        """
+        异步获取动作的一个令牌
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 实际等待的秒数
+        """
+        return await self.get_bucket(csp, action).async_acquire()
+
+    def reset(self) -> None:
+        """
+        清空所有令牌桶，配置变更后重新创建
+        """
+        with self._lock:
+            self._buckets.clear()
+
+    @staticmethod
+    def _get_conf(csp: str, action: str) -> Tuple[float, int]:
+        """
+        获取动作的限流配置，动作的单独配置优先，速率须大于 0 且容量不小于 1
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 速率和容量
+        """
+        csp_conf = cloud_config[csp]['settings']
+        limit_conf = csp_conf.get('rate_limit') or {}
+        action_conf = (limit_conf.get('actions') or {}).get(action) or {}
+
+        default = csp_conf.get('req_limit', 1)
+        rate = action_conf.get('rate', limit_conf.get('rate', default))
+        burst = action_conf.get('burst', limit_conf.get('burst'))
+        try:
+            rate = float(rate)
+            # 未配置容量时与速率相同，速率小于 1 时容量为 1
+            burst = max(int(rate), 1) if burst is None else int(burst)
+        except (TypeError, ValueError):
+            rate = burst = None
+        if rate is None or rate <= 0 or burst < 1:
+            raise CloudSDKRequestError(f'rate limit of {csp}:{action} is invalid, rate must be positive and burst at least 1')
+        return rate, burst
+
+
+# 外部使用的实例，进程内所有客户端共享
+rate_limiter = RateLimiter()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from threading import Lock
+from ..configs import cloud_config
+from ..exceptions import CloudSDKRequestError
+from .limiter import rate_limiter, TokenBucket
+from .retry import retry_policies, RetryPolicy
+from .executor import io_executor
+from utils import dynamic_import_class, logger
+
+if TYPE_CHECKING:
+    from ..native_sdk import AbstractNativeSDK
+    from ..cleaner import AbstractCloudCleaner, CleanPlan
+
+
+__all__ = ['ActionDescriptor', 'ActionRegistry', 'action_registry']
+
+
+class ActionDescriptor:
+    """
+    编译后的动作描述，包含执行动作所需的配置、类、清洗计划和限流对象，由注册表为每个供应商和动作创建一次
+    """
+
+    def __init__(self, csp: str, action: str) -> None:
+        """
+        解析配置，加载原生 sdk 类、清洗器类和供应商类
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        """
+        csp_config = cloud_config[csp]
+        if not csp_config or action not in (csp_config.get('actions') or {}):
+            raise CloudSDKRequestError(f'action {csp}:{action} is not configured')
+
+        self.csp = csp
+        self.action = action
+
+        # 配置提取
+        self.csp_conf: dict = csp_config['settings']
+        self.action_conf: dict = csp_config['actions'][action]['settings']
+        self.interface_conf: dict = csp_config['actions'][action]['interface']
+        self.region_str: Optional[str] = self.csp_conf.get('region_str')
+
+        # 分页配置，动作中的配置优先于供应商的配置
+        self.paging_conf = {
+            k: self.action_conf.get(k, self.csp_conf.get(k))
+            for k in ('paging_base', 'limit_str', 'limit_max', 'offset_str',
+                      'offset_init', 'cursor_str', 'cursor_path')
+        }
+
+        # 原生 sdk 类优先从供应商模块中查找，其次从原生 sdk 包中查找
+        sdk_name = self.csp_conf['native_sdk']
+        self.native_sdk_class: type = dynamic_import_class(f'cloud.native_sdk.{csp}.{sdk_name}') or \
+            dynamic_import_class(f'cloud.native_sdk.{sdk_name}')
+        if not self.native_sdk_class:
+            raise CloudSDKRequestError(f'native sdk {sdk_name} of {csp} is not found')
+        self.native_sdk_options: dict = self.csp_conf.get('native_sdk_options') or {}
+        self.compiled: dict = self.native_sdk_class.compile(self.interface_conf)
+
+        # 清洗器类和清洗计划
+        cleaner_name = self.csp_conf['cleaner']
+        self.cleaner_class: type = dynamic_import_class(f'cloud.cleaner.{csp}.{cleaner_name}')
+        if not self.cleaner_class:
+            raise CloudSDKRequestError(f'cleaner {cleaner_name} of {csp} is not found')
+        self.clean_plan: CleanPlan = self.cleaner_class.compile_plan(action, self.interface_conf)
+
+        # 增量解析，动作开启且数据路径可增量解析时，原生 sdk 以迭代器的形式返回数据数组，由清洗器逐条消费
+        # 游标分页在清洗前读取游标，此时响应体尚未解析完，数组之后的游标会丢失，因此不能同时开启
+        self.stream_path: Optional[Tuple[str, ...]] = None
+        if self.action_conf.get('stream_parse') and self.paging_conf['paging_base'] == 'cursor':
+            raise CloudSDKRequestError(f'stream_parse of {csp}:{action} can not be used with cursor paging')
+        if self.action_conf.get('stream_parse') and self.clean_plan.streamable:
+            self.stream_path = self.clean_plan.data_path
+
+        # 限流和重试
+        self.bucket: TokenBucket = rate_limiter.get_bucket(csp, action)
+        self.retry_policy: RetryPolicy = retry_policies.get_policy(csp, action)
+
+        # 清洗器输出紧凑记录，即按字段顺序排列的元组，由响应在需要时转为字典
+        self.compact_records: bool = bool(self.action_conf.get('compact_records'))
+
+        # 合并分页和地域时去重的联合唯一键
+        self.unique_keys: Optional[list] = self.action_conf.get('unique_keys')
+
+        # 同一请求同时在途的分页数，限制未被消费的分页占用的内存，动作中的配置优先
+        self.max_in_flight: int = self.action_conf.get('max_in_flight') or \
+            self.csp_conf.get('max_in_flight') or io_executor.max_workers * 2
+
+        # 单飞合并
+        single_flight_conf = self.csp_conf.get('single_flight') or {}
+        self.single_flight: bool = single_flight_conf.get('enable', True)
+        self.single_flight_shared: bool = single_flight_conf.get('shared', False)
+
+    def create_native_sdk(self, params: dict) -> AbstractNativeSDK:
+        """
+        创建原生 sdk 对象，并设置请求信息和解析得到的供应商类
+        :param params: 请求参数
+        :return: 原生 sdk 对象
+        """
+        native_sdk = self.native_sdk_class(**self.native_sdk_options)
+        native_sdk.set(self.interface_conf, params, self.compiled)
+        return native_sdk
+
+    def create_cleaner(self, request) -> AbstractCloudCleaner:
+        """
+        创建清洗器对象
+        :param request: 底层请求对象
+        :return: 清洗器对象
+        """
+        return self.cleaner_class(request)
+
+
+class ActionRegistry:
+    """
+    动作注册表，每个供应商和动作只编译一次描述，执行请求时不再动态加载类和查找配置
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化描述存储字典
+        """
+        self._descriptors: Dict[Tuple[str, str], ActionDescriptor] = {}
+        self._lock = Lock()
+
+    def get(self, csp: str, action: str) -> ActionDescriptor:
+        """
+        获取动作描述，不存在则编译
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 动作描述
+        """
+        key = (csp, action)
+        descriptor = self._descriptors.get(key)
+        if descriptor is None:
+            with self._lock:
+                descriptor = self._descriptors.get(key)
+                if descriptor is None:
+                    descriptor = ActionDescriptor(csp, action)
+                    self._descriptors[key] = descriptor
+        return descriptor
+
+    def compile_all(self) -> None:
+        """
+        编译所有配置完整的供应商的所有动作，由应用启动时调用
+        编译失败的动作记录日志后跳过，执行请求时再次编译并抛出异常，不影响其他动作
+        """
+        for csp in cloud_config:
+            csp_config = cloud_config[csp]
+            if 'settings' not in csp_config:
+                continue
+            for action, action_config in (csp_config.get('actions') or {}).items():
+                if 'settings' in action_config and 'interface' in action_config:
+                    try:
+                        self.get(csp, action)
+                    except CloudSDKRequestError as e:
+                        logger.error(f'compile action {csp}:{action} failed: {e}')
+
+    def clear(self) -> None:
+        """
+        清空所有描述，配置或限流重置后需要重新编译
+        """
+        with self._lock:
+            self._descriptors.clear()
+
+
+# 外部使用的实例，进程内共享
+action_registry = ActionRegistry()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from typing import List, Optional, Any, Iterable, Union
-from ..configs import cloud_config
+from .registry import action_registry
 from ..exceptions import CloudSDKRequestError
-from asset.models import Region
+from asset.models import Count, region_plan
+from django.core.cache import caches
 from math import ceil
+import hashlib
+import json
 
 
 __all__ = [
@@ -22,6 +25,8 @@ class CloudSDKRequest:
                  action: str,
                  region_mode: int = 0,
                  record_count: int = 0,
+                 speculative: bool = False,
+                 checkpoint: bool = False,
                  **kwargs) -> None:
         """
         请求信息初始化
@@ -29,26 +34,78 @@ class CloudSDKRequest:
         :param action: 动作标识
         :param region_mode: 地域查询模式，0 单个地域；1 有效地域；2 所有地域
 、      :param record_count: 请求的记录数量，方便直接进行分页并发访问
+        :param speculative: 是否根据统计的记录数，在首个分页返回前预先请求后续分页
+        :param checkpoint: 是否保存已完成的分页，重新执行相同请求时只请求缺失的分页
         :param kwargs: 请求参数
         """
         # 属性设置
         self.csp = csp
         self.action = action
 
-        # 配置提取
-        self.csp_conf = cloud_config[csp]['settings']
-        self.action_conf = cloud_config[csp]['actions'][action]['settings']
-        self.interface_conf = cloud_config[csp]['actions'][action]['interface']
+        # 配置提取，来自注册表中编译后的动作描述
+        self.descriptor = action_registry.get(csp, action)
+        self.csp_conf = self.descriptor.csp_conf
+        self.action_conf = self.descriptor.action_conf
+        self.interface_conf = self.descriptor.interface_conf
+        self.paging_conf = self.descriptor.paging_conf
 
         # 私有属性设置
         self._action_type, self._record_name = action.split('_')
         self._region_mode = region_mode
         self._record_count = record_count
         self._params = kwargs
+        self.speculative = speculative
+        self.checkpoint = checkpoint
 
         # 所有子请求，可以全部是请求对象，也可以全部是真正进行处理的底层请求
         self._child_requests = None
 
+        # 多地域查询时因熔断而跳过的地域
+        self.skipped_regions = []
+
+    @property
+    def region(self) -> Optional[str]:
+        """
+        获取请求参数中的地域
+        """
+        return self._params.get(self.descriptor.region_str)
+
+    @property
+    def cursor_paging(self) -> bool:
+        """
+        是否为游标分页，游标分页的下一页需要根据上一页响应中的游标构建
+        """
+        return self.paging_conf['paging_base'] == 'cursor'
+
+    @property
+    def presized(self) -> bool:
+        """
+        是否已根据设置的记录数分页，已分页的所有分页请求可以直接并发执行
+        """
+        return bool(self._record_count) and self.action_conf['paging_required'] and not self.cursor_paging
+
+    def clone(self) -> CloudSDKRequest:
+        """
+        以相同的设置和参数构建尚未执行的新请求，用于重新执行请求
+        :return: 请求对象
+        """
+        return CloudSDKRequest(
+            self.csp,
+            self.action,
+            region_mode=self._region_mode,
+            record_count=self._record_count,
+            speculative=self.speculative,
+            checkpoint=self.checkpoint,
+            **self._params
+        )
+
+    def get_fingerprint(self) -> str:
+        """
+        获取请求指纹，由供应商、动作、地域模式和规范化的请求参数计算得到
+        :return: 指纹字符串
+        """
+        return make_fingerprint(self.csp, self.action, self._region_mode, self._params)
+
     def get_child_requests(self) -> List[CloudSDKChildRequest]:
         """
         获取子请求列表
@@ -60,14 +117,64 @@ class CloudSDKRequest:
 
     def redo_paging_request(self, record_count):
         """
-        重新分页
+        重新分页，记录数为空时只保留首页，丢弃根据统计的记录数预先构建的分页
         :param record_count: 记录数
         :return: 子请求列表
         """
         self._record_count = record_count
         paging_required = self.action_conf['paging_required']
-        if self._record_count and paging_required:
-            self._child_requests = self._paging_request()
+        if self.cursor_paging or not paging_required:
+            return
+        if self._record_count:
+            self._child_requests = self._paging_request(self._record_count)
+        else:
+            self._child_requests = self._paging_request(1)
+
+    def build_speculative_requests(self) -> List[CloudSDKLowLayerRequest]:
+        """
+        根据统计的记录数预估分页，构建除首页以外的分页请求
+        预估的分页与确定总数后重新分页得到的分页一一对应
+        :return: 预估的分页请求列表
+        """
+        paging_required = self.action_conf['paging_required']
+        if not paging_required or self.cursor_paging:
+            return []
+
+        estimated_count = self.estimate_record_count()
+        if not estimated_count:
+            return []
+        return self._paging_request(estimated_count)[1:]
+
+    def build_cursor_request(
+            self,
+            request: CloudSDKLowLayerRequest,
+            resp: dict) -> Optional[CloudSDKLowLayerRequest]:
+        """
+        根据分页请求及其原始响应中的游标，构建下一页请求
+        :param request: 当前分页请求
+        :param resp: 当前分页的原始响应
+        :return: 下一页请求，错误响应、没有游标或游标未变化时返回 None
+        """
+        if not isinstance(resp, dict) or 'Error' in resp:
+            return None
+
+        cursor = resp
+        for p in self.paging_conf['cursor_path'].split('.'):
+            cursor = cursor.get(p) if isinstance(cursor, dict) else None
+        if not cursor or cursor == request.get(self.paging_conf['cursor_str']):
+            return None
+        return self._cursor_request(cursor)
+
+    def estimate_record_count(self) -> int:
+        """
+        从记录统计中获取当前地域下动作的记录数
+        :return: 记录数，不存在统计时为 0
+        """
+        region_str = self.csp_conf['region_str']
+        region = self._params.get(region_str, '')
+        counts = Count.dao.get_field_value(
+            'record_num', region=region, interface=self.action)
+        return sum(counts)
 
     def _build_child_requests(self) -> None:
         """
@@ -111,7 +218,11 @@ class CloudSDKRequest:
         # 当动作需要分页并已设置了记录数目，则进行分页
         paging_required = self.action_conf['paging_required']
         if self._record_count and paging_required:
-            self._child_requests = self._paging_request()
+            self._child_requests = self._paging_request(self._record_count)
+
+        # 当动作需要分页但未设置记录数目，则只构建首页，其响应同时用于确定分页
+        elif paging_required:
+            self._child_requests = self._paging_request(1)
 
         # 直接加入子请求列表
         else:
@@ -126,25 +237,33 @@ class CloudSDKRequest:
         # 提取配置
         region_str = self.csp_conf['region_str']
 
-        # 只针对有资源的区域进行遍历，冗余一页减少再次查询
+        # 只针对有资源的区域进行遍历，已知为空的地域按较长的间隔探测
         if self._region_mode == 2:
-            regions_with_records = []
-            child_request = [
-                CloudSDKRequest(self.csp,
-                                self.action,
-                                rc + self.csp_conf['limit_max'],
-                                **self._params,
-                                **{region_str: region})
-                for region, rc in regions_with_records
-            ]
-
-        # 对所有资源的区域进行遍历
+            record_counts = self._get_region_record_counts()
+            child_request = []
+            for region in region_plan.get_regions(self.csp):
+                rc = record_counts.get(region)
+                if rc == 0 and not self._probe_empty_region(region):
+                    continue
+
+                # 有记录的地域根据记录数直接分页，首页返回后按实际总数重新分页，没有统计的地域通过首页确定分页
+                child_request.append(
+                    CloudSDKRequest(self.csp,
+                                    self.action,
+                                    record_count=rc or 0,
+                                    speculative=self.speculative,
+                                    checkpoint=self.checkpoint,
+                                    **self._params,
+                                    **{region_str: region}))
+
+        # 对供应商下所有已启用的区域进行遍历
         else:
-            regions = Region.dao.get_field_value('flag')
+            regions = region_plan.get_regions(self.csp)
             child_request = [
                 CloudSDKRequest(self.csp,
                                 self.action,
-                                0,
+                                speculative=self.speculative,
+                                checkpoint=self.checkpoint,
                                 **self._params,
                                 **{region_str: region})
                 for region in regions
@@ -152,22 +271,52 @@ class CloudSDKRequest:
 
         self._child_requests = child_request
 
-    def _paging_request(self) -> List[CloudSDKLowLayerRequest]:
+    def _get_region_record_counts(self) -> dict:
+        """
+        从记录统计中获取动作在各地域下的记录数，同一地域的各项目记录数累加
+        :return: 地域和记录数组成的字典，没有统计的地域不在其中
+        """
+        record_counts = {}
+        queryset = Count.dao.get_queryset(interface=self.action).values_list('region', 'record_num')
+        for region, record_num in queryset:
+            record_counts[region] = record_counts.get(region, 0) + record_num
+        return record_counts
+
+    def _probe_empty_region(self, region: str) -> bool:
+        """
+        判断已知为空的地域是否需要探测，每个探测间隔内只探测一次，间隔通过 empty_region_probe_interval 配置
+        :param region: 地域
+        :return: 是否需要探测
+        """
+        interval = self.csp_conf.get('empty_region_probe_interval', 86400)
+        key = f'cloud_sdk:empty_region_probe:{self.csp}:{self.action}:{region}'
+        try:
+            return caches['default'].add(key, 1, interval)
+        except Exception:
+            return True
+
+    def _paging_request(self, record_count: int) -> List[CloudSDKLowLayerRequest]:
         """
         将请求构造成多个访问不同分页的子请求
+        :param record_count: 记录数
+        :return: 分页请求列表
         """
+        # 游标分页只能先构建首页
+        if self.cursor_paging:
+            return [self._cursor_request()]
+
         # 配置提取
-        limit_str = self.csp_conf['limit_str']
-        limit = self.csp_conf['limit_max']
-        offset_str = self.csp_conf['offset_str']
-        offset = self.csp_conf['offset_init']
-        paging_base = self.csp_conf['paging_base']
+        limit_str = self.paging_conf['limit_str']
+        limit = self.paging_conf['limit_max']
+        offset_str = self.paging_conf['offset_str']
+        offset = self.paging_conf['offset_init']
+        paging_base = self.paging_conf['paging_base']
 
         # 构造子请求列表
         child_requests = []
 
         # 向上取整得到总共的页数
-        page_number = int(ceil(float(self._record_count) / limit))
+        page_number = int(ceil(float(record_count) / limit))
 
         # 根据页数生成子请求
         for page in range(page_number):
@@ -188,6 +337,17 @@ class CloudSDKRequest:
 
         return child_requests
 
+    def _cursor_request(self, cursor: Optional[str] = None) -> CloudSDKLowLayerRequest:
+        """
+        构造游标分页的子请求
+        :param cursor: 游标，为空时表示首页
+        :return: 分页请求
+        """
+        paging_params = {self.paging_conf['limit_str']: self.paging_conf['limit_max']}
+        if cursor:
+            paging_params[self.paging_conf['cursor_str']] = cursor
+        return CloudSDKLowLayerRequest(self, **self._params, **paging_params)
+
     def __iter__(self) -> Iterable[CloudSDKChildRequest]:
         """
         返回包含子请求的迭代器
@@ -232,6 +392,20 @@ class CloudSDKLowLayerRequest:
         self.parent = parent
         self.params = kwargs
 
+    @property
+    def region(self) -> Optional[str]:
+        """
+        获取请求参数中的地域
+        """
+        return self.params.get(self.parent.descriptor.region_str)
+
+    def get_fingerprint(self) -> str:
+        """
+        获取底层请求指纹，由供应商、动作和规范化的请求参数计算得到
+        :return: 指纹字符串
+        """
+        return make_fingerprint(self.parent.csp, self.parent.action, self.params)
+
     def get(self, item: str, default: Any = None) -> Any:
         """
         获取参数值
@@ -242,5 +416,15 @@ class CloudSDKLowLayerRequest:
         return self.params.get(item, default)
 
 
+def make_fingerprint(*parts: Any) -> str:
+    """
+    计算各部分的指纹，字典按键排序后序列化，保证参数顺序不影响结果
+    :param parts: 组成部分
+    :return: 指纹字符串
+    """
+    normalized = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
 # 子请求类型
 CloudSDKChildRequest = Union[CloudSDKLowLayerRequest, CloudSDKRequest]
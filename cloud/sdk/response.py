@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from .dedup import DedupIndex
+from .columnar import ColumnarRecords
 
 
 __all__ = ['CloudSDKResponse']
@@ -8,45 +10,184 @@ __all__ = ['CloudSDKResponse']
 class CloudSDKResponse:
     """
     云接口 SDK 响应
+    数据可以是字典列表，也可以是按字段顺序排列的紧凑记录列表，紧凑记录在首次访问 data 或 to_dict() 时转为字典，
+    并替换原有的紧凑记录，之后的访问返回同一列表，对其的修改会保留
+    列式记录在不需要去重时以列的形式合并，访问 rows 时组装为紧凑记录，访问 data 或 to_dict() 时直接转为字典
     """
 
-    def __init__(self, data: Optional[list] = None, total: int = 0) -> None:
+    def __init__(self,
+                 data: Optional[Union[list, ColumnarRecords]] = None,
+                 total: int = 0,
+                 retries: int = 0,
+                 unique_keys: Optional[Sequence[str]] = None,
+                 schema: Optional[Sequence[str]] = None) -> None:
         """
         初始化
-        :param data: 响应数据
+        :param data: 响应数据，为记录列表或列式记录
+        :param total: 数据总数
+        :param retries: 获取数据过程中的重试次数
+        :param unique_keys: 联合唯一的键，设置后合并响应时丢弃重复的记录
+        :param schema: 紧凑记录的字段顺序，数据为字典列表时为 None
         """
-        if data and isinstance(data, list):
+        # 尚未组装的列式记录，顺序上位于已组装的数据之后
+        self._frames: List[ColumnarRecords] = []
+        if isinstance(data, ColumnarRecords):
+            self._data = []
+            if len(data):
+                self._frames.append(data)
+            schema = data.schema
+        elif data and isinstance(data, list):
             self._data = data
         else:
             self._data = []
+        self._schema: Optional[Tuple[str, ...]] = tuple(schema) if schema else None
         self._total = total
-        self._current = len(self._data)
+        self._current = len(self._data) + sum(len(f) for f in self._frames)
+        self._retries = retries
+        self.skipped_regions = []
+
+        # 去重索引，以及合并时发现的重复记录数和缺失记录的来源
+        self._dedup = DedupIndex(unique_keys) if unique_keys else None
+        if self._dedup is not None:
+            self._data = self._dedup.filter(self.rows, schema=self._schema)
+            self._current = len(self._data)
+        self._duplicates = 0
+        self.gaps: List[dict] = []
+
+    @property
+    def data(self) -> List[dict]:
+        """
+        获取响应数据，紧凑记录和列式记录在首次访问时转为字典列表
+        """
+        self._materialize()
+        return self._data
 
     @property
-    def data(self) -> list:
+    def rows(self) -> list:
         """
-        获取响应数据
+        获取原样保存的数据，紧凑记录时为元组列表，尚未组装的列式记录此时组装
         """
+        if self._frames:
+            for frame in self._frames:
+                self._data.extend(frame)
+            self._frames = []
         return self._data
 
-    def extend(self, resp: CloudSDKResponse) -> None:
+    def _materialize(self) -> None:
+        """
+        将紧凑记录和列式记录转为字典列表，替换原有的记录，列式记录直接由列组装为字典
+        """
+        if self._schema is None:
+            return
+        schema = self._schema
+        data = [dict(zip(schema, row)) for row in self._data]
+        for frame in self._frames:
+            data.extend(frame.to_records())
+        self._data, self._schema, self._frames = data, None, []
+
+    def to_columns(self) -> Dict[str, list]:
+        """
+        获取按字段排列的列，列式记录直接合并列，不组装记录，供需要列式计算的调用方使用
+        :return: 字段和列组成的字典
+        """
+        if self._schema is None:
+            data = self._data
+            keys = list(data[0]) if data else []
+            return {k: [r.get(k) for r in data] for k in keys}
+
+        columns = {k: [row[i] for row in self._data] for i, k in enumerate(self._schema)}
+        for frame in self._frames:
+            for k, column in zip(self._schema, frame.columns):
+                columns[k].extend(column)
+        return columns
+
+    @property
+    def schema(self) -> Optional[Tuple[str, ...]]:
+        """
+        获取紧凑记录的字段顺序
+        """
+        return self._schema
+
+    def extend(self, resp: CloudSDKResponse, source: Any = None, check_gap: bool = False) -> None:
         """
         合并响应，用于多个 SDK 请求的响应
         :param resp: SDK 响应对象
+        :param source: 响应的来源，如地域，用于报告重复和缺失
+        :param check_gap: 是否检查响应的记录数少于总数，用于总数可信的分页
         """
-        self._data.extend(resp.data)
-        self._current += resp.current
+        # 按去重前收到的记录数检查缺失，跨来源重复而丢弃的记录不算缺失
+        if check_gap and resp.current < resp.total:
+            self.gaps.append({'source': source, 'total': resp.total, 'received': resp.current})
+        self._accept(resp, source)
         self._total += resp.total
+        self._retries += resp.retries
+        self.skipped_regions.extend(resp.skipped_regions)
+        self.gaps.extend(resp.gaps)
 
-    def add(self, resp: CloudSDKResponse) -> None:
+    def add(self, resp: CloudSDKResponse, source: Any = None) -> None:
         """
         叠加响应，用于多个底层请求的响应
         :param resp: SDK 响应对象
+        :param source: 响应的来源，用于报告重复
         """
         if not self._total:
             self._total = resp.total
-        self._data.extend(resp.data)
-        self._current += resp.current
+        self._accept(resp, source)
+        self._retries += resp.retries
+
+    def _accept(self, resp: CloudSDKResponse, source: Any) -> int:
+        """
+        接收响应的数据，设置了去重索引时丢弃重复的记录
+        :param resp: SDK 响应对象
+        :param source: 响应的来源
+        :return: 接收的记录数
+        """
+        empty = not self._data and not self._frames
+
+        # 对方只有列式记录且不需要去重时直接合并列，不组装记录
+        if resp._frames and not resp._data and self._dedup is None and (empty or resp.schema == self._schema):
+            self._schema = resp.schema
+            self._frames.extend(resp._frames)
+            self._current += resp.current
+            self._duplicates += resp.duplicates
+            return resp.current
+
+        # 记录形式不一致时，当前响应为空则沿用对方的形式，否则统一转为字典
+        data = resp.rows
+        if resp.schema != self._schema:
+            if empty:
+                self._schema = resp.schema
+            else:
+                self._materialize()
+                data = resp.data
+
+        if self._dedup is not None:
+            data = self._dedup.filter(data, source, self._schema)
+        self.rows.extend(data)
+        self._current += len(data)
+        self._duplicates += resp.duplicates
+        return len(data)
+
+    @property
+    def duplicates(self) -> int:
+        """
+        获取合并时丢弃的重复记录数
+        """
+        return self._duplicates + (self._dedup.duplicates if self._dedup is not None else 0)
+
+    def dedup_report(self) -> Optional[dict]:
+        """
+        获取重复和缺失的报告
+        :return: 报告，没有重复和缺失时返回 None
+        """
+        if not self.duplicates and not self.gaps:
+            return None
+        return {
+            'unique_keys': list(self._dedup.unique_keys) if self._dedup is not None else [],
+            'duplicates': self.duplicates,
+            'samples': self._dedup.samples if self._dedup is not None else [],
+            'gaps': self.gaps
+        }
 
     @property
     def total(self) -> int:
@@ -62,12 +203,27 @@ class CloudSDKResponse:
         """
         return self._current
 
-    def to_dict(self) -> dict:
+    @property
+    def retries(self) -> int:
+        """
+        获取重试次数
+        """
+        return self._retries
+
+    def to_dict(self, compact: bool = False) -> dict:
         """
         字典转化
+        :param compact: 是否保留紧凑记录，保留时附带字段顺序，用于缓存等内部存储
         """
-        return {
+        resp = {
             'total': self._total,
             'current': self._current,
-            'data': self.data
+            'retries': self._retries,
+            'skipped_regions': self.skipped_regions,
+            'duplicates': self.duplicates,
+            'gaps': self.gaps,
+            'data': self.rows if compact else self.data
         }
+        if compact and self._schema:
+            resp['schema'] = list(self._schema)
+        return resp
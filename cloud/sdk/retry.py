@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Tuple
+from threading import Lock
+from ..configs import cloud_config
+import random
+
+
+__all__ = ['RetryPolicy', 'RetryPolicyRegistry', 'retry_policies']
+
+
+class RetryPolicy:
+    """
+    重试策略，使用带抖动的指数退避计算重试间隔
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 1,
+                 max_delay: float = 30,
+                 jitter: float = 1,
+                 retryable_codes: Optional[List[str]] = None) -> None:
+        """
+        初始化
+        :param max_attempts: 最大尝试次数，包括首次请求
+        :param base_delay: 首次重试的基础间隔，单位秒
+        :param max_delay: 最大重试间隔，单位秒
+        :param jitter: 抖动比例，间隔在 [1 - jitter, 1] 倍的退避时间内随机，1 即完全抖动
+        :param retryable_codes: 可重试的错误码，为空时所有错误均可重试
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0), 1)
+        self.retryable_codes = set(retryable_codes or [])
+
+    def should_retry(self, attempt: int, resp: Optional[dict]) -> bool:
+        """
+        判断请求是否需要重试
+        :param attempt: 已尝试的次数
+        :param resp: 原生 sdk 响应
+        :return: 是否需要重试
+        """
+        if attempt >= self.max_attempts or not resp or 'Error' not in resp:
+            return False
+        if not self.retryable_codes:
+            return True
+        return str(resp['Error'].get('code')) in self.retryable_codes
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        计算下一次重试前的等待时间
+        :param attempt: 已尝试的次数
+        :return: 等待秒数
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return backoff * random.uniform(1 - self.jitter, 1)
+
+
+class RetryPolicyRegistry:
+    """
+    按供应商和动作缓存重试策略
+    配置来自 yaml 的 settings.retry，动作的 settings.retry 中的配置项优先
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化重试策略存储字典
+        """
+        self._policies: Dict[Tuple[str, str], RetryPolicy] = {}
+        self._lock = Lock()
+
+    def get_policy(self, csp: str, action: str) -> RetryPolicy:
+        """
+        获取动作的重试策略，不存在则根据配置创建
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 重试策略
+        """
+        key = (csp, action)
+        policy = self._policies.get(key)
+        if policy is None:
+            with self._lock:
+                policy = self._policies.get(key)
+                if policy is None:
+                    csp_conf = cloud_config[csp]['settings'].get('retry') or {}
+                    action_conf = cloud_config[csp]['actions'][action]['settings'].get('retry') or {}
+                    policy = RetryPolicy(**{**csp_conf, **action_conf})
+                    self._policies[key] = policy
+        return policy
+
+
+# 外部使用的实例，进程内所有客户端共享
+retry_policies = RetryPolicyRegistry()
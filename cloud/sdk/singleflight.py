@@ -0,0 +1,103 @@
+from typing import Any, Callable, Dict
+from concurrent.futures import Future
+from threading import Lock
+from django.core.cache import caches
+from utils import logger
+
+
+__all__ = ['SingleFlight', 'single_flight']
+
+
+class SingleFlight:
+    """
+    合并相同键的并发调用，同一时刻只有一个调用真正执行，其余调用等待并共享其结果
+    进程内通过 future 共享结果，跨进程时通过 redis 锁选出执行者，并通过缓存共享结果
+    """
+
+    # 共享锁和结果的键前缀
+    key_prefix = 'cloud_sdk:single_flight'
+
+    def __init__(self, lock_timeout: float = 120, result_ttl: float = 10) -> None:
+        """
+        初始化
+        :param lock_timeout: 跨进程锁的超时时间，单位秒，避免执行者异常退出后锁无法释放
+        :param result_ttl: 跨进程共享结果的保留时间，单位秒
+        """
+        self._lock_timeout = lock_timeout
+        self._result_ttl = result_ttl
+        self._calls: Dict[str, Future] = {}
+        self._lock = Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], shared: bool = False) -> Any:
+        """
+        执行调用，存在相同键的进行中调用时等待并返回其结果
+        :param key: 调用键
+        :param fn: 调用函数
+        :param shared: 是否同时跨进程合并
+        :return: 调用结果
+        """
+        with self._lock:
+            f = self._calls.get(key)
+            leader = f is None
+            if leader:
+                f = Future()
+                self._calls[key] = f
+
+        if not leader:
+            return f.result()
+
+        try:
+            result = self._do_shared(key, fn) if shared else fn()
+        except BaseException as e:
+            f.set_exception(e)
+            raise
+        else:
+            f.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        """
+        获取进程内进行中的调用数
+        """
+        return len(self._calls)
+
+    def _do_shared(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        跨进程合并调用，获得锁的进程执行并写入结果，其余进程等待锁释放后读取结果
+        共享缓存不可用或结果缺失时直接执行
+        :param key: 调用键
+        :param fn: 调用函数
+        :return: 调用结果
+        """
+        cache = caches['default']
+        result_key = f'{self.key_prefix}:result:{key}'
+        try:
+            lock = cache.lock(f'{self.key_prefix}:lock:{key}', timeout=self._lock_timeout)
+            acquired = lock.acquire(blocking=False)
+        except Exception as e:
+            logger.warning(f'single flight lock failed: {e}')
+            return fn()
+
+        if acquired:
+            try:
+                result = fn()
+                cache.set(result_key, result, self._result_ttl)
+                return result
+            finally:
+                lock.release()
+
+        # 其他进程正在执行，等待其释放锁后读取共享的结果
+        if lock.acquire(blocking=True, blocking_timeout=self._lock_timeout):
+            lock.release()
+        result = cache.get(result_key)
+        if result is None:
+            return fn()
+        return result
+
+
+# 外部使用的实例，进程内所有客户端共享
+single_flight = SingleFlight()
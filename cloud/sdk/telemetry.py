@@ -0,0 +1,250 @@
+from typing import Dict, List, Optional, Tuple
+from threading import Lock, Thread, Event
+from bisect import bisect_left
+from django.conf import settings
+from utils import safe_json_dumps, logger
+import os
+import time
+
+
+__all__ = ['LatencyHistogram', 'ActionMetrics', 'Telemetry', 'telemetry']
+
+
+class LatencyHistogram:
+    """
+    固定分桶的耗时直方图，分位数在所在分桶内线性插值估算
+    """
+
+    # 分桶上界，单位毫秒，最后一个分桶没有上界
+    bounds = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+    def __init__(self) -> None:
+        """
+        初始化
+        """
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._max = 0.0
+
+    def observe(self, ms: float) -> None:
+        """
+        记录一次耗时
+        :param ms: 耗时，单位毫秒
+        """
+        self._counts[bisect_left(self.bounds, ms)] += 1
+        self._count += 1
+        self._max = max(self._max, ms)
+
+    def percentile(self, q: float) -> float:
+        """
+        估算分位数
+        :param q: 分位，0 到 1 之间
+        :return: 耗时，单位毫秒
+        """
+        if not self._count:
+            return 0.0
+
+        rank = q * self._count
+        seen = 0
+        for i, count in enumerate(self._counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i else 0
+                upper = self.bounds[i] if i < len(self.bounds) else self._max
+                return min(lower + (upper - lower) * (rank - seen) / count, self._max)
+            seen += count
+        return self._max
+
+    def to_dict(self) -> dict:
+        """
+        字典转化，分桶以上界为键，最后一个分桶的键为 inf
+        """
+        keys = [str(b) for b in self.bounds] + ['inf']
+        return {
+            'p50': round(self.percentile(0.5), 2),
+            'p95': round(self.percentile(0.95), 2),
+            'p99': round(self.percentile(0.99), 2),
+            'max': round(self._max, 2),
+            'buckets': dict(zip(keys, self._counts))
+        }
+
+
+class ActionMetrics:
+    """
+    单个供应商、动作和地域的调用指标
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化
+        """
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.errors = 0
+        self.throttles = 0
+        self.retries = 0
+        self.call_time = 0.0
+        self.limiter_wait = 0.0
+        self.pages = 0
+        self.records = 0
+        self.clean_time = 0.0
+        self._lock = Lock()
+
+    def record_call(self, seconds: float, limiter_wait: float, failed: bool, throttled: bool) -> None:
+        """
+        记录一次供应商调用
+        :param seconds: 调用耗时，单位秒
+        :param limiter_wait: 调用前等待限流和并发限制的时间，单位秒
+        :param failed: 是否为错误响应
+        :param throttled: 是否被供应商限流
+        """
+        with self._lock:
+            self.latency.observe(seconds * 1000)
+            self.calls += 1
+            self.errors += failed
+            self.throttles += throttled
+            self.call_time += seconds
+            self.limiter_wait += limiter_wait
+
+    def record_retry(self) -> None:
+        """
+        记录一次重试
+        """
+        with self._lock:
+            self.retries += 1
+
+    def record_clean(self, seconds: float, records: int) -> None:
+        """
+        记录一次分页的清洗
+        :param seconds: 清洗耗时，单位秒
+        :param records: 分页的记录数
+        """
+        with self._lock:
+            self.pages += 1
+            self.records += records
+            self.clean_time += seconds
+
+    def to_dict(self) -> dict:
+        """
+        字典转化
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'throttles': self.throttles,
+                'retries': self.retries,
+                'call_time': round(self.call_time, 3),
+                'limiter_wait': round(self.limiter_wait, 3),
+                'clean_time': round(self.clean_time, 3),
+                'pages': self.pages,
+                'records': self.records,
+                'avg_page_size': round(self.records / self.pages, 2) if self.pages else 0,
+                'latency_ms': self.latency.to_dict()
+            }
+
+
+class Telemetry:
+    """
+    云 SDK 调用遥测，按供应商、动作和地域汇总调用指标
+    可在进程内查询快照，也可通过 settings.CLOUD_SDK_TELEMETRY 配置周期性导出 json 快照
+    """
+
+    def __init__(self) -> None:
+        """
+        初始化
+        """
+        self._metrics: Dict[Tuple[str, str, str], ActionMetrics] = {}
+        self._lock = Lock()
+        self._exporter: Optional[Thread] = None
+        self._stopped = Event()
+
+    def get_metrics(self, csp: str, action: str, region: Optional[str]) -> ActionMetrics:
+        """
+        获取调用指标，不存在则创建，首次创建时启动周期性导出
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :param region: 地域
+        :return: 调用指标
+        """
+        key = (csp, action, region or '')
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.get(key)
+                if metrics is None:
+                    metrics = ActionMetrics()
+                    self._metrics[key] = metrics
+                self._start_exporter()
+        return metrics
+
+    def snapshot(self) -> List[dict]:
+        """
+        获取所有调用指标的快照，按调用总耗时降序排列，便于找出占用同步时间最多的动作
+        :return: 指标字典列表
+        """
+        with self._lock:
+            items = list(self._metrics.items())
+
+        result = []
+        for (csp, action, region), metrics in items:
+            result.append({'csp': csp, 'action': action, 'region': region, **metrics.to_dict()})
+        result.sort(key=lambda m: m['call_time'], reverse=True)
+        return result
+
+    def reset(self) -> None:
+        """
+        清空所有调用指标
+        """
+        with self._lock:
+            self._metrics.clear()
+
+    def export(self, path: Optional[str] = None) -> None:
+        """
+        将快照导出为 json 文件，先写入临时文件再替换
+        :param path: 文件路径，为空时使用配置的路径
+        """
+        path = path or self._get_conf().get('export_file') or os.path.join(
+            settings.LOG_DIR, 'cloud-sdk-telemetry.json')
+        data = {'timestamp': int(time.time()), 'metrics': self.snapshot()}
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(safe_json_dumps(data))
+        os.replace(tmp_path, path)
+
+    def stop(self) -> None:
+        """
+        停止周期性导出
+        """
+        self._stopped.set()
+
+    def _start_exporter(self) -> None:
+        """
+        配置了导出间隔时启动周期性导出的守护线程
+        """
+        if self._exporter is not None:
+            return
+        interval = self._get_conf().get('export_interval', 0)
+        if not interval:
+            return
+
+        def run() -> None:
+            while not self._stopped.wait(interval):
+                try:
+                    self.export()
+                except Exception as e:
+                    logger.warning(f'export telemetry failed: {e}')
+
+        self._exporter = Thread(target=run, name='cloud-sdk-telemetry', daemon=True)
+        self._exporter.start()
+
+    @staticmethod
+    def _get_conf() -> dict:
+        """
+        获取遥测配置
+        :return: 配置字典
+        """
+        return getattr(settings, 'CLOUD_SDK_TELEMETRY', None) or {}
+
+
+# 外部使用的实例，进程内所有客户端共享
+telemetry = Telemetry()
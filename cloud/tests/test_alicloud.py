@@ -1,6 +1,5 @@
 from django.test import SimpleTestCase
-from cloud.native_sdk.alicloud import AlicloudNativeSDK
-from datetime import date
+from cloud.native_sdk.alicloud import ALiCloudNativeSDK
 
 
 class TestALiCloudNativeSDK(SimpleTestCase):
@@ -9,24 +8,26 @@ class TestALiCloudNativeSDK(SimpleTestCase):
     """
 
     def setUp(self):
-        self.sdk = AlicloudNativeSDK()
+        self.sdk = ALiCloudNativeSDK()
 
         # 地域查询，不带区域
         self.region_interface = {
-            'interface': CloudInterface(**{
+            'interface': {
                 'name': 'DescribeRegions',
                 'module': 'ecs',
-                'version': date(2014, 5, 26)}),
-            'public_params': {}
+                'version': 'v20140526',
+                'input_params': None},
+            'params': {}
         }
 
         # 可用区查询，带区域
         self.zone_interface = {
-            'interface': CloudInterface(**{
+            'interface': {
                 'name': 'DescribeZones',
                 'module': 'ecs',
-                'version': date(2014, 5, 26)}),
-            'public_params': {
+                'version': 'v20140526',
+                'input_params': None},
+            'params': {
                 'Region': 'default'
             }
         }
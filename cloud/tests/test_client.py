@@ -0,0 +1,228 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch
+from contextlib import ExitStack
+from types import SimpleNamespace
+from math import ceil
+from cloud.native_sdk import FakeCloudProvider, FakeNativeSDK
+from cloud.sdk import CloudSDKClient, CloudSDKRequest, action_registry, response_cache, circuit_breakers, \
+    concurrency_controller, CircuitBreaker, AdaptiveConcurrencyLimit, TokenBucket
+from cloud.exceptions import CloudSDKClientError
+import os
+import shutil
+import tempfile
+import time
+
+
+class InlineThread:
+    """
+    在调用 start() 时同步执行目标函数的线程，使后台刷新在测试中确定地完成
+    """
+
+    def __init__(self, target, daemon: bool = False) -> None:
+        self._target = target
+
+    def start(self) -> None:
+        self._target()
+
+
+class TestCloudSDKClient(SimpleTestCase):
+    """
+    单元测试，使用进程内的合成原生 sdk 执行主机查询，覆盖调度器的分页、检查点、熔断、自适应并发和缓存
+    各用例使用不同的地域，避免共享的熔断器、并发限制和缓存互相影响
+    """
+
+    options = {'total': 8000, 'regions': 8}
+
+    def setUp(self):
+        self.descriptor = action_registry.get('qcloud', 'query_hosts')
+
+    def _fake(self, **options) -> ExitStack:
+        """
+        将主机查询的原生 sdk 替换为合成原生 sdk，并缩短重试间隔
+        :param options: 合成供应商的初始化参数
+        :return: 上下文管理器
+        """
+        stack = ExitStack()
+        stack.enter_context(patch.multiple(
+            self.descriptor, native_sdk_class=FakeNativeSDK, native_sdk_options={**self.options, **options}))
+        stack.enter_context(patch.multiple(self.descriptor.retry_policy, base_delay=0.001, max_delay=0.01))
+        return stack
+
+    def _count(self, region: str, **options) -> int:
+        """
+        获取合成供应商中地域的记录数
+        :param region: 地域
+        :param options: 合成供应商的初始化参数
+        :return: 记录数
+        """
+        return FakeCloudProvider(**{**self.options, **options}).count(region)
+
+    @staticmethod
+    def _count_calls():
+        """
+        统计合成原生 sdk 的请求次数
+        :return: 上下文管理器，进入后得到记录调用的 mock 对象
+        """
+        return patch.object(FakeNativeSDK, 'request', autospec=True, side_effect=FakeNativeSDK.request)
+
+    def test_paging(self):
+        """
+        首个分页确定分页后并发请求其余分页，按页序合并得到完整且清洗后的记录
+        """
+        region = 'fake-region-00'
+        with self._fake(seed=1), self._count_calls() as native:
+            resp = CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+
+        count = self._count(region, seed=1)
+        self.assertGreater(count, 100)
+        self.assertEqual(native.call_count, ceil(count / 100))
+        self.assertEqual(resp.total, count)
+        self.assertEqual(resp.current, count)
+        self.assertEqual([r['instance_id'] for r in resp.data], [f'ins-{region}-{i:08d}' for i in range(count)])
+        self.assertEqual(resp.data[1]['name'], 'fake-00000001')
+        self.assertEqual(resp.data[1]['project'], 1)
+
+    def test_checkpoint_resume(self):
+        """
+        中断后重新执行相同的请求，只请求检查点中缺失的分页，全部完成后清除检查点
+        """
+        region = 'fake-region-01'
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+
+        with self.settings(CLOUD_SDK_CHECKPOINT={'directory': directory}), self._fake(seed=2):
+            # 在途数为 1，中断时没有仍在执行的分页
+            with patch.object(self.descriptor, 'max_in_flight', 1):
+                pages = CloudSDKClient().execute_iter(
+                    CloudSDKRequest('qcloud', 'query_hosts', checkpoint=True, Region=region))
+                next(pages)
+                next(pages)
+                pages.close()
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+            with self._count_calls() as native:
+                resp = CloudSDKClient().execute(
+                    CloudSDKRequest('qcloud', 'query_hosts', checkpoint=True, Region=region))
+
+        count = self._count(region, seed=2)
+        self.assertEqual(native.call_count, ceil(count / 100) - 2)
+        self.assertEqual(resp.current, count)
+        self.assertEqual(len({r['instance_id'] for r in resp.data}), count)
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_breaker(self):
+        """
+        调用方引起的错误不影响熔断，服务端错误达到比例后打开熔断，打开期间不再请求供应商
+        """
+        region = 'fake-region-02'
+        breaker = circuit_breakers.get_breaker('qcloud', region, 'query_hosts')
+
+        with self._fake(seed=3, throttle_rate=1, throttle_codes=['InvalidParameter']):
+            for _ in range(12):
+                with self.assertRaises(CloudSDKClientError):
+                    CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        with self._fake(seed=3, throttle_rate=1, throttle_codes=['InternalError']):
+            for _ in range(4):
+                with self.assertRaises(CloudSDKClientError):
+                    CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+            with self._count_calls() as native, self.assertRaises(CloudSDKClientError) as ctx:
+                CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+        self.assertEqual(native.call_count, 0)
+        self.assertIn('CircuitBreakerOpen', str(ctx.exception))
+
+    def test_breaker_half_open(self):
+        """
+        打开时间已满后进入半开状态，只放行探测请求，探测失败重新打开，成功则关闭
+        """
+        clock = [0.0]
+        with patch('cloud.sdk.breaker.time', SimpleNamespace(monotonic=lambda: clock[0])):
+            breaker = CircuitBreaker(failure_ratio=0.5, window=4, min_calls=2, open_seconds=10)
+            breaker.record(False)
+            breaker.record(False)
+            self.assertFalse(breaker.allow())
+
+            clock[0] = 10
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record(False)
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+            # 不计入统计的结果归还探测机会
+            clock[0] = 20
+            self.assertTrue(breaker.allow())
+            breaker.record(None)
+            self.assertTrue(breaker.allow())
+            breaker.record(True)
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_aimd(self):
+        """
+        成功时加性增加并发上限，被限流时乘性减少，名额用尽时不阻塞地获取失败
+        """
+        limit = AdaptiveConcurrencyLimit(initial=2, decrease=0.5, cooldown=0)
+        self.assertTrue(limit.try_acquire())
+        self.assertTrue(limit.try_acquire())
+        self.assertFalse(limit.try_acquire())
+        limit.release(succeeded=True)
+        self.assertEqual(limit.stats(), {'limit': 2, 'in_flight': 1})
+        limit.release(throttled=True)
+        self.assertEqual(limit.stats(), {'limit': 1, 'in_flight': 0})
+
+    def test_aimd_decrease_on_throttle(self):
+        """
+        被限流的分页按重试策略重试，同一轮的多次限流只缩减一次并发上限，结束后名额全部归还
+        """
+        region = 'fake-region-03'
+        limit = concurrency_controller.get_limit('qcloud', 'query_hosts', region)
+        initial = limit.limit
+
+        with self._fake(seed=4, throttle_rate=1), self._count_calls() as native:
+            with self.assertRaises(CloudSDKClientError):
+                CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+
+        self.assertEqual(native.call_count, self.descriptor.retry_policy.max_attempts)
+        self.assertEqual(limit.limit, initial // 2)
+        self.assertEqual(limit.in_flight, 0)
+
+    def test_token_bucket(self):
+        """
+        突发容量内的令牌无需等待，超出时按速率计算等待时间
+        """
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual([bucket.reserve(), bucket.reserve()], [0, 0])
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+
+    def test_cache(self):
+        """
+        有效期内直接返回缓存，过期宽限期内返回旧值并在后台刷新
+        """
+        region = 'fake-region-04'
+        clock = [time.time()]
+        self.addCleanup(response_cache.clear)
+
+        with self._fake(seed=5), \
+                patch.dict(self.descriptor.action_conf, {'cache': {'ttl': 60, 'stale_ttl': 600}}), \
+                patch('cloud.sdk.cache.time', SimpleNamespace(time=lambda: clock[0])), \
+                patch('cloud.sdk.cache.Thread', InlineThread), \
+                self._count_calls() as native:
+            first = CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+            calls = native.call_count
+
+            hit = CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+            self.assertEqual(native.call_count, calls)
+            self.assertEqual(hit.data, first.data)
+
+            # 过期后返回旧值，刷新在后台进行，此处由同步线程立即完成
+            clock[0] += 120
+            stale = CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+            self.assertEqual(stale.current, first.current)
+            self.assertEqual(native.call_count, calls * 2)
+
+            refreshed = CloudSDKClient().execute(CloudSDKRequest('qcloud', 'query_hosts', Region=region))
+            self.assertEqual(native.call_count, calls * 2)
+            self.assertEqual(refreshed.data, first.data)
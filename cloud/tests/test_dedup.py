@@ -0,0 +1,44 @@
+from django.test import SimpleTestCase
+from cloud.sdk import CloudSDKResponse, DedupIndex
+
+
+class TestDedup(SimpleTestCase):
+    """
+    单元测试
+    """
+
+    def test_filter(self):
+        """
+        丢弃已出现过的记录，缺少唯一键的记录全部保留
+        """
+        index = DedupIndex(['instance_id', 'region'])
+        first = [{'instance_id': 'i-1', 'region': 'a'}, {'instance_id': 'i-2', 'region': 'a'}]
+        self.assertIs(index.filter(first, 'p0'), first)
+
+        second = [{'instance_id': 'i-2', 'region': 'a'}, {'instance_id': 'i-2', 'region': 'b'}, {}, {}]
+        self.assertEqual(index.filter(second, 'p1'), second[1:])
+        self.assertEqual(index.duplicates, 1)
+        self.assertEqual(index.samples, [{'key': ('i-2', 'a'), 'source': 'p1', 'first_source': 'p0'}])
+
+    def test_merge(self):
+        """
+        跨分页和地域合并时去重，记录数少于总数的集合报告为缺失
+        """
+        page_0 = CloudSDKResponse([{'instance_id': f'i-{n}'} for n in range(0, 3)], 5)
+        page_1 = CloudSDKResponse([{'instance_id': f'i-{n}'} for n in range(2, 4)], 5)
+        leaf = CloudSDKResponse()
+        leaf.add(page_0)
+        leaf.add(page_1)
+
+        other = CloudSDKResponse([{'instance_id': 'i-3'}, {'instance_id': 'i-9'}], 2)
+        short = CloudSDKResponse([{'instance_id': 'i-10'}], 3)
+
+        full = CloudSDKResponse(unique_keys=['instance_id'])
+        full.extend(leaf, 'region-a', check_gap=True)
+        full.extend(other, 'region-b', check_gap=True)
+        full.extend(short, 'region-c', check_gap=True)
+        self.assertEqual([r['instance_id'] for r in full.data], ['i-0', 'i-1', 'i-2', 'i-3', 'i-9', 'i-10'])
+        self.assertEqual(full.current, 6)
+        self.assertEqual(full.duplicates, 2)
+        self.assertEqual(full.gaps, [{'source': 'region-c', 'total': 3, 'received': 1}])
+        self.assertEqual(full.to_dict()['duplicates'], 2)
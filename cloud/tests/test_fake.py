@@ -0,0 +1,81 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch
+from cloud.native_sdk import FakeCloudProvider, FakeNativeSDK, FakeUCloudServer
+from cloud.sdk import CloudSDKClient, CloudSDKRequest, action_registry
+from urllib.request import urlopen
+import json
+
+
+class TestFakeCloudProvider(SimpleTestCase):
+    """
+    单元测试
+    """
+
+    def test_deterministic_inventory(self):
+        """
+        相同种子生成相同的清单，各地域记录数之和等于总数
+        """
+        a = FakeCloudProvider(total=10000, regions=30, seed=1)
+        b = FakeCloudProvider(total=10000, regions=30, seed=1)
+        self.assertEqual(sum(a.count(r) for r in a.regions), 10000)
+        self.assertEqual([a.count(r) for r in a.regions], [b.count(r) for r in b.regions])
+
+    def test_paging(self):
+        """
+        按偏移和按页码分页得到相同的记录
+        """
+        by_offset = FakeCloudProvider(total=1000, regions=2)
+        by_page = FakeCloudProvider(
+            total=1000, regions=2, limit_str='PageSize', offset_str='PageNumber',
+            paging_base='page', offset_init=1)
+        region = by_offset.regions[0]
+
+        _, offset_resp = by_offset.handle('DescribeInstances', {'Region': region, 'Offset': 100, 'Limit': 100})
+        _, page_resp = by_page.handle('DescribeInstances', {'Region': region, 'PageNumber': 2, 'PageSize': 100})
+        self.assertEqual(offset_resp, page_resp)
+        self.assertEqual(offset_resp['TotalCount'], by_offset.count(region))
+
+    def test_max_rps(self):
+        """
+        超出每秒请求数时返回限流错误码
+        """
+        provider = FakeCloudProvider(total=100, regions=1, max_rps=2, throttle_codes=['Throttling'])
+        codes = [provider.handle('DescribeInstances', {})[0] for _ in range(3)]
+        self.assertIn('Throttling', codes)
+
+    def test_native_sdk(self):
+        """
+        相同配置的原生 sdk 共享合成供应商
+        """
+        sdk = FakeNativeSDK(total=500, regions=1, throttle_rate=1, throttle_codes=['Throttling'])
+        sdk.set({'name': 'DescribeInstances', 'input_params': None}, {'Limit': 10})
+        self.assertEqual(sdk.request()['Error']['code'], 'Throttling')
+
+    def test_ucloud_server(self):
+        """
+        本地 HTTP 服务使用优刻得风格的响应
+        """
+        with FakeUCloudServer(total=300, regions=3) as server:
+            region = server.provider.regions[0]
+            with urlopen(f'{server.url}?Action=DescribeUHostInstance&Region={region}&Limit=5&Offset=0') as f:
+                resp = json.loads(f.read())
+        self.assertEqual(resp['RetCode'], 0)
+        self.assertEqual(len(resp['UHostSet']), 5)
+        self.assertEqual(resp['TotalCount'], server.provider.count(region))
+
+    def test_client_with_ucloud_server(self):
+        """
+        客户端经优刻得原生 sdk 访问本地 HTTP 服务，被限流的分页重试后得到完整的记录
+        """
+        descriptor = action_registry.get('ucloud', 'query_hosts')
+        with FakeUCloudServer(total=2000, regions=1, seed=1, throttle_rate=0.3) as server:
+            region = server.provider.regions[0]
+            with patch.multiple(descriptor, native_sdk_options={'url': server.url}), \
+                    patch.multiple(descriptor.retry_policy, max_attempts=20, base_delay=0.01):
+                resp = CloudSDKClient().execute(CloudSDKRequest('ucloud', 'query_hosts', Region=region))
+
+        self.assertGreater(resp.retries, 0)
+        self.assertEqual(resp.total, 2000)
+        self.assertEqual(resp.current, 2000)
+        self.assertEqual(resp.data[0]['instance_id'], f'ins-{region}-00000000')
+        self.assertEqual(len({r['instance_id'] for r in resp.data}), 2000)
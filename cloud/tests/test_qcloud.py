@@ -1,6 +1,5 @@
 from django.test import SimpleTestCase
-from cloud.native_sdk.qcloud import QcloudNativeSDK
-from datetime import date
+from cloud.native_sdk.qcloud import QCloudNativeSDK
 
 
 class TestQCloudNativeSDK(SimpleTestCase):
@@ -9,40 +8,41 @@ class TestQCloudNativeSDK(SimpleTestCase):
     """
 
     def setUp(self):
-        self.sdk = QcloudNativeSDK()
+        self.sdk = QCloudNativeSDK()
 
         # 新 sdk 接口例子
         self.new_interface = {
-            'interface': CloudInterface(**{
+            'interface': {
                 'name': 'DescribeZones',
                 'module': 'cvm',
-                'version': date(2017, 3, 12)}),
-            'public_params': {
+                'version': 'v20170312',
+                'input_params': None},
+            'params': {
                 'Region': 'ap-shanghai'
             }
         }
 
         # 老 sdk 接口例子
         self.old_interface = {
-            'interface': CloudInterface(**{
+            'interface': {
                 'name': 'DescribeProject',
                 'module': 'account',
-                'version': None}),
-            'public_params': {
+                'version': None,
+                'input_params': None},
+            'params': {
                 'Region': 'ap-shanghai'
             }
         }
 
         # 账单接口
         self.bill_interface = {
-            'interface': CloudInterface(**{
+            'interface': {
                 'name': 'DescribeBillDetail',
                 'module': 'billing',
-                'version': date(2018, 7, 9)}),
-            'public_params': {
-                'Region': 'ap-shanghai'
-            },
-            'request_params': {
+                'version': 'v20180709',
+                'input_params': None},
+            'params': {
+                'Region': 'ap-shanghai',
                 'PeriodType': 'byPayTime',
                 'Offset': 0,
                 'Limit': 1,
@@ -84,5 +84,3 @@ class TestQCloudNativeSDK(SimpleTestCase):
         resp = self.sdk.request()
         # self.assertEqual(resp['code'], 0, 'failed')
         print(resp)
-
-from tencentcloud.billing.v20180709.models import DescribeBillDetailRequest
\ No newline at end of file
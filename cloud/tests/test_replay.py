@@ -0,0 +1,76 @@
+from django.test import SimpleTestCase
+from cloud.native_sdk import AbstractNativeSDK, ReplayNativeSDK
+import tempfile
+import shutil
+
+
+class EchoNativeSDK(AbstractNativeSDK):
+    """
+    用于录制的原生 sdk，返回请求参数并记录调用次数
+    """
+
+    calls = 0
+
+    def request(self) -> dict:
+        EchoNativeSDK.calls += 1
+        return {'TotalCount': 1, 'InstanceSet': [dict(self._params)]}
+
+
+class TestReplayNativeSDK(SimpleTestCase):
+    """
+    单元测试
+    """
+
+    def setUp(self):
+        self.cassette_dir = tempfile.mkdtemp()
+        self.interface = {
+            'name': 'DescribeInstances',
+            'module': 'cvm',
+            'version': 'v20170312',
+            'input_params': ['Region']
+        }
+        self.params = {'Region': 'ap-shanghai', 'Offset': 0, 'Limit': 100}
+        EchoNativeSDK.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.cassette_dir, ignore_errors=True)
+
+    def _get_sdk(self, **kwargs) -> ReplayNativeSDK:
+        sdk = ReplayNativeSDK(
+            target='cloud.tests.test_replay.EchoNativeSDK',
+            cassette_dir=self.cassette_dir,
+            **kwargs)
+        sdk.set(self.interface, self.params)
+        return sdk
+
+    def test_record_and_replay(self):
+        """
+        录制后回放，回放时不再调用被录制的原生 sdk
+        """
+        recorded = self._get_sdk(mode='record').request()
+        replayed = self._get_sdk(mode='replay').request()
+        self.assertEqual(recorded, replayed)
+        self.assertEqual(EchoNativeSDK.calls, 1)
+
+    def test_replay_missing(self):
+        """
+        回放未录制的请求，应该返回错误响应
+        """
+        resp = self._get_sdk(mode='replay').request()
+        self.assertEqual(resp['Error']['code'], 'CassetteNotFound')
+
+    def test_auto(self):
+        """
+        自动模式下未录制的请求先录制，之后回放
+        """
+        self._get_sdk(mode='auto').request()
+        self._get_sdk(mode='auto').request()
+        self.assertEqual(EchoNativeSDK.calls, 1)
+
+    def test_error_injection(self):
+        """
+        注入比例为 1 时总是返回注入的错误码
+        """
+        self._get_sdk(mode='record').request()
+        resp = self._get_sdk(error_rate=1, error_codes=['RequestLimitExceeded']).request()
+        self.assertEqual(resp['Error']['code'], 'RequestLimitExceeded')
@@ -0,0 +1,74 @@
+from django.test import SimpleTestCase
+from cloud.sdk import CloudSDKResponse, ColumnarRecords
+
+
+class TestCompactResponse(SimpleTestCase):
+    """
+    单元测试
+    """
+
+    def setUp(self) -> None:
+        self.schema = ('instance_id', 'name')
+        self.rows = [(f'i-{n}', f'host-{n}') for n in range(3)]
+
+    def test_materialize(self):
+        """
+        紧凑记录原样保存，首次访问数据时转为字典并替换紧凑记录，之后的访问返回同一列表
+        """
+        resp = CloudSDKResponse(self.rows, 3, schema=self.schema)
+        self.assertIs(resp.rows, self.rows)
+        compact = resp.to_dict(compact=True)
+        self.assertEqual(compact['schema'], list(self.schema))
+        self.assertIs(compact['data'], self.rows)
+
+        self.assertEqual(resp.data[0], {'instance_id': 'i-0', 'name': 'host-0'})
+        self.assertIs(resp.data, resp.data)
+        self.assertIsNone(resp.schema)
+
+        resp.data[0]['name'] = 'renamed'
+        self.assertEqual(resp.to_dict()['data'][0]['name'], 'renamed')
+
+    def test_merge(self):
+        """
+        合并紧凑记录时保持紧凑并按唯一键去重，与字典记录合并时统一转为字典
+        """
+        full = CloudSDKResponse(unique_keys=['instance_id'])
+        full.add(CloudSDKResponse(self.rows, 4, schema=self.schema))
+        full.add(CloudSDKResponse(self.rows[2:], 4, schema=self.schema))
+        self.assertEqual(full.schema, self.schema)
+        self.assertEqual(full.current, 3)
+        self.assertEqual(full.duplicates, 1)
+
+        full.add(CloudSDKResponse([{'instance_id': 'i-2', 'name': 'host-2'}, {'instance_id': 'i-3', 'name': 'host-3'}]))
+        self.assertIsNone(full.schema)
+        self.assertEqual([r['instance_id'] for r in full.data], ['i-0', 'i-1', 'i-2', 'i-3'])
+        self.assertEqual(full.duplicates, 2)
+
+    def test_columnar(self):
+        """
+        列式记录合并时保持为列，访问记录时才组装，与紧凑记录合并时按顺序组装
+        """
+        columns = [[f'i-{n}' for n in range(3)], [f'host-{n}' for n in range(3)]]
+        full = CloudSDKResponse()
+        full.add(CloudSDKResponse(ColumnarRecords(self.schema, columns), 5))
+        full.add(CloudSDKResponse(ColumnarRecords(self.schema, columns), 5))
+        self.assertEqual(full.current, 6)
+        self.assertEqual(full.to_columns()['name'], columns[1] * 2)
+
+        full.add(CloudSDKResponse(self.rows[:1], 5, schema=self.schema))
+        self.assertEqual(full.rows, self.rows * 2 + self.rows[:1])
+        self.assertEqual(full.data[3], {'instance_id': 'i-0', 'name': 'host-0'})
+
+    def test_columnar_with_dict(self):
+        """
+        列式记录与字典记录合并时，列式记录只组装一次
+        """
+        full = CloudSDKResponse(ColumnarRecords(self.schema, [['i-0', 'i-1'], ['host-0', 'host-1']]), 3)
+        full.add(CloudSDKResponse([{'instance_id': 'i-2', 'name': 'host-2'}], 3))
+        self.assertIsNone(full.schema)
+        self.assertEqual(full.current, 3)
+        self.assertEqual(full.data, [
+            {'instance_id': 'i-0', 'name': 'host-0'},
+            {'instance_id': 'i-1', 'name': 'host-1'},
+            {'instance_id': 'i-2', 'name': 'host-2'},
+        ])
@@ -1,23 +1,51 @@
-from django.test import TestCase
-from utils import DAO
-from asset.models import IDC
-from ..models import CloudAction
-from ..sdk.reuqest import CloudSDKRequest
+from django.test import SimpleTestCase
+from unittest.mock import patch
+from ..sdk import CloudSDKRequest, CloudSDKClient, action_registry
+from ..native_sdk import ReplayNativeSDK
+from ..exceptions import CloudSDKRequestError
+import os
 
 
-class TestSDKClient(TestCase):
+class TestSDKClient(SimpleTestCase):
     """
-    单元测试
+    单元测试，使用录制的磁带回放供应商响应，完整执行客户端的分页、清洗和合并
     """
 
     def setUp(self):
-        # 获取供应商和动作
-        self.idc = DAO(IDC).get_obj(flag='qcloud')
-        self.action = DAO(CloudAction).get_obj(flag='query_region')
+        self.cassette_dir = os.path.join(os.path.dirname(__file__), 'cassettes')
+
+    def _replay(self, csp: str, action: str):
+        """
+        将动作的原生 sdk 替换为回放磁带的原生 sdk
+        :param csp: 云供应商标识
+        :param action: 动作标识
+        :return: 上下文管理器
+        """
+        descriptor = action_registry.get(csp, action)
+        options = {'mode': 'replay', 'cassette_dir': self.cassette_dir}
+        return patch.multiple(descriptor, native_sdk_class=ReplayNativeSDK, native_sdk_options=options)
 
     def test_get_request(self):
         """
-        未设置进行请求，应该报错
+        未配置的动作，应该报错
         """
-        req = CloudSDKRequest(self.idc, self.action)
-        print(req)
\ No newline at end of file
+        with self.assertRaises(CloudSDKRequestError):
+            CloudSDKRequest('alicloud', 'query_nothing')
+
+    def test_replay_execute(self):
+        """
+        回放录制的主机查询，得到清洗后的完整响应
+        """
+        with self._replay('alicloud', 'query_hosts'):
+            resp = CloudSDKClient().execute(CloudSDKRequest('alicloud', 'query_hosts', Region='cn-hangzhou'))
+
+        self.assertEqual(resp.total, 3)
+        self.assertEqual(resp.current, 3)
+        self.assertEqual(resp.duplicates, 0)
+        self.assertEqual(resp.data[0], {
+            'instance_id': 'i-bp10001',
+            'name': 'web-01',
+            'public_ip': '47.96.0.1',
+            'project': 'rg-web'
+        })
+        self.assertEqual([r['public_ip'] for r in resp.data], ['47.96.0.1', '47.96.0.2', ''])
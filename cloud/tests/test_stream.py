@@ -0,0 +1,52 @@
+from django.test import SimpleTestCase
+from cloud.native_sdk import StreamedJSON
+from cloud.exceptions import CloudNativeSDKError
+import json
+
+
+class TestStreamedJSON(SimpleTestCase):
+    """
+    单元测试
+    """
+
+    def setUp(self) -> None:
+        self.doc = {
+            'RequestId': 'req',
+            'Instances': {
+                'Instance': [{'InstanceId': f'i-{n}', 'Name': f'主机-{n}', 'Cpu': n * 1.5} for n in range(50)],
+                'Extra': [1, 2]
+            },
+            'TotalCount': 1234567890
+        }
+        self.body = json.dumps(self.doc, ensure_ascii=False).encode('utf-8')
+
+    def _chunks(self, size: int):
+        return (self.body[i:i + size] for i in range(0, len(self.body), size))
+
+    def test_stream(self):
+        """
+        逐个元素解析数据数组，迭代结束后数组之后的成员合并到文档中，块边界可以落在数字和多字节字符中间
+        """
+        for size in (1, 7, 4096):
+            closed = []
+            doc = StreamedJSON(self._chunks(size), ('Instances', 'Instance'), lambda: closed.append(True)).parse()
+            self.assertNotIn('TotalCount', doc)
+            doc['Instances']['Instance'] = list(doc['Instances']['Instance'])
+            self.assertEqual(doc, self.doc)
+            self.assertEqual(closed, [True])
+
+    def test_missing_path(self):
+        """
+        数据路径不存在时返回完整的文档
+        """
+        doc = StreamedJSON(self._chunks(5), ('Zones', 'Zone')).parse()
+        self.assertEqual(doc, self.doc)
+
+    def test_truncated(self):
+        """
+        响应体不完整时迭代抛出异常
+        """
+        self.body = self.body[:len(self.body) // 2]
+        doc = StreamedJSON(self._chunks(64), ('Instances', 'Instance')).parse()
+        with self.assertRaises(CloudNativeSDKError):
+            list(doc['Instances']['Instance'])
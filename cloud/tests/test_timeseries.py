@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+from cloud.cleaner import MonitorSeries, MonitorFrame
+from utils import get_datetime_with_tz
+
+
+class TestMonitorFrame(SimpleTestCase):
+    """
+    单元测试
+    """
+
+    def setUp(self) -> None:
+        self.timestamps = [1700000000 + 60 * i for i in range(180)]
+        self.values = list(range(180))
+
+    def test_buckets(self):
+        """
+        按列转换的日、时、分和逐个转换的结果一致
+        """
+        frame = MonitorFrame.from_points(self.timestamps, self.values, host='ins-1')
+        records = frame.to_records({'day': 'Day', 'hour': 'Hour', 'minute': 'Minute', 'host': 'Host'})
+        for ts, r in zip(self.timestamps, records):
+            dt = get_datetime_with_tz(ts)
+            self.assertEqual((r['day'], r['hour'], r['minute'], r['host']), (dt.date(), dt.hour, dt.minute, 'ins-1'))
+
+    def test_from_records(self):
+        """
+        数据点记录按主机分为多个时间序列，毫秒时间戳转为秒，空值转为 None
+        """
+        records = [
+            {'timestamp': ts * 1000, 'instanceId': f'i-{n % 2}', 'Average': None if n == 3 else n}
+            for n, ts in enumerate(self.timestamps[:6])
+        ]
+        frame = MonitorFrame.from_records(records, 'timestamp', 'Average', 'instanceId', ts_unit='ms')
+        self.assertEqual([s.host for s in frame.series], ['i-0', 'i-1'])
+        self.assertEqual(frame.column_list('Timestamp')[:3], self.timestamps[0:6:2])
+        self.assertEqual(frame.column_list('Value')[3:], [1.0, None, 5.0])
+
+    def test_aggregate(self):
+        """
+        按小时聚合后每个桶的时间戳为整点
+        """
+        series = MonitorSeries('ins-1', 'cpu_usage', self.timestamps, self.values).aggregate('hour', 'max')
+        self.assertEqual(sum(1 for _ in MonitorFrame([series])), 4)
+        self.assertTrue(all(m == 0 for m in series.column('Minute')))
+        self.assertEqual(series.values[-1], 179)
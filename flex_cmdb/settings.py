@@ -48,7 +48,8 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django_apscheduler',
     'rest_framework',
-    'asset'
+    'asset',
+    'cloud.apps.CloudConfig'
 ]
 
 
@@ -167,6 +168,31 @@ CACHES = {
 }
 
 
+# 云 SDK 共享执行器配置
+CLOUD_SDK_EXECUTOR = {
+    # 最大线程数，云接口请求属于网络密集型，线程数可远大于 cpu 核数
+    'max_workers': 64
+}
+
+
+# 云 SDK 分页检查点配置
+CLOUD_SDK_CHECKPOINT = {
+    # 保存已完成分页的目录
+    'directory': os.path.join(BASE_DIR, 'sdk-checkpoints/'),
+    # 检查点的有效期，单位秒，超过有效期的检查点不再复用
+    'stale_seconds': 3600
+}
+
+
+# 云 SDK 调用遥测配置
+CLOUD_SDK_TELEMETRY = {
+    # 周期性导出 json 快照的间隔，单位秒，为 0 时不导出
+    'export_interval': 60,
+    # 快照文件路径
+    'export_file': os.path.join(LOG_DIR, 'cloud-sdk-telemetry.json')
+}
+
+
 # ASGI 应用入口
 ASGI_APPLICATION = 'flex_finance.routing.application'
 